@@ -6,7 +6,8 @@ import random
 from datetime import date, datetime, timedelta
 from app.database import SessionLocal
 from app.models import Record
-from app.crud import generate_record_id
+from app.crud import generate_record_id, bump_data_versions, refresh_rollup_buckets, rollup_bucket
+from app.utils.phone import normalize_phone
 
 # Sample data lists
 ZONES = ["Delhi", "GGN", "Noida", "Gurgaon", "Faridabad", "Ghaziabad"]
@@ -89,6 +90,7 @@ def add_sample_data():
         ]
         
         records_created = 0
+        rollup_buckets = set()  # sales_monthly_rollup buckets to recompute before commit
         
         # Create multiple orders for repeat clients (same phone, same address)
         for client_data in repeat_clients:
@@ -130,6 +132,7 @@ def add_sample_data():
                     body=random.choice(BODIES),
                     client_name=client_data["client_name"],
                     client_phone=client_data["client_phone"],
+                    client_phone_normalized=normalize_phone(client_data["client_phone"]),
                     client_address=client_data["client_address"],
                     zone=client_data["zone"],
                     sale_price=round(random.uniform(30000, 150000), 2) if random.random() > 0.1 else None,  # 90% have price
@@ -146,6 +149,7 @@ def add_sample_data():
                 
                 db.add(record)
                 db.flush()
+                rollup_buckets.add(rollup_bucket(record))
                 records_created += 1
                 
                 if records_created % 10 == 0:
@@ -198,6 +202,7 @@ def add_sample_data():
                 body=random.choice(BODIES),
                 client_name=client_name,
                 client_phone=client_phone,
+                client_phone_normalized=normalize_phone(client_phone),
                 client_address=generate_address(zone),
                 zone=zone,
                 sale_price=round(random.uniform(30000, 150000), 2) if random.random() > 0.1 else None,  # 90% have price
@@ -218,11 +223,14 @@ def add_sample_data():
             
             db.add(record)
             db.flush()  # Flush to get the record ID generated and updated in the session
+            rollup_buckets.add(rollup_bucket(record))
             records_created += 1
             
             if records_created % 10 == 0:
                 print(f"  Added {records_created} records...")
         
+        refresh_rollup_buckets(db, rollup_buckets)
+        bump_data_versions(db, "records", "filter_options")  # invalidates caches in running app processes
         db.commit()
         print(f"✅ Successfully added {records_created} sample records!")
         print(f"   - Delivery dates range from {start_date} to {today}")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Propose composite indexes for the records table from the query log
+
+Reads the JSON Lines log written with QUERY_LOG_PATH set, compares the
+indexes real filter/sort combinations need with the ones the database has,
+and optionally writes them as an Alembic migration.
+
+Usage: python advise_indexes.py --log queries.jsonl [--min-share 0.02] [--write-migration] [--drop-unused]
+"""
+import argparse
+import os
+import sys
+from sqlalchemy import inspect
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from app.config import settings
+from app.database import engine
+from app.utils.index_advisor import read_query_log, propose_indexes, unused_indexes, render_migration
+
+
+def existing_indexes() -> dict[str, tuple[str, ...]]:
+    """Plain-column indexes of the records table (expression and full-text indexes are skipped)"""
+    indexes = {}
+    for index in inspect(engine).get_indexes("records"):
+        if index["column_names"] and None not in index["column_names"]:
+            indexes[index["name"]] = tuple(index["column_names"])
+    return indexes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose composite record indexes from the query log")
+    parser.add_argument("--log", default=settings.query_log_path, help="Query log (default: QUERY_LOG_PATH)")
+    parser.add_argument("--min-share", type=float, default=0.02, help="Ignore shapes below this share of queries (default: 0.02)")
+    parser.add_argument("--max-equals", type=int, default=2, help="Equality columns per index (default: 2)")
+    parser.add_argument("--write-migration", action="store_true", help="Write the proposals as an Alembic migration")
+    parser.add_argument("--drop-unused", action="store_true", help="Also drop unused single-column indexes in the migration")
+    parser.add_argument("--message", default="Add composite record indexes", help="Migration message")
+    args = parser.parse_args()
+    
+    if not args.log or not os.path.exists(args.log):
+        parser.error("No query log; set QUERY_LOG_PATH while serving traffic, then pass --log")
+    with open(args.log) as f:
+        shapes = read_query_log(f)
+    total = sum(shapes.values())
+    if not total:
+        print("The query log has no filter queries yet")
+        return 1
+    
+    script = ScriptDirectory.from_config(Config("alembic.ini"))
+    with engine.connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+    if current != script.get_current_head():
+        # Pending migrations may already create some of the proposed indexes
+        print(f"Warning: database is at revision {current}, not {script.get_current_head()}; "
+              "run alembic upgrade head first", file=sys.stderr)
+    
+    existing = existing_indexes()
+    proposals = propose_indexes(shapes, existing, args.min_share, args.max_equals)
+    drops = unused_indexes(shapes, existing, proposals)
+    
+    print(f"{total} logged queries, {len(shapes)} distinct filter/sort shapes")
+    for shape, count in shapes.most_common(10):
+        filters = ", ".join(shape.equals + shape.ranges) or "no filters"
+        print(f"  {count:8d}  {filters}; sort {shape.sort}")
+    print("Proposed indexes:" if proposals else "Proposed indexes: none (existing indexes cover the logged queries)")
+    for proposal in proposals:
+        print(f"  {proposal.name} ({', '.join(proposal.columns)}): {proposal.queries} queries ({proposal.share:.1%})")
+    if drops:
+        print("Drop candidates:")
+        for drop in drops:
+            print(f"  {drop.name}: {drop.reason}")
+    
+    if args.write_migration:
+        if not proposals and not (args.drop_unused and drops):
+            print("Nothing to migrate")
+            return 0
+        revision, source = render_migration(
+            proposals, drops if args.drop_unused else [], script.get_current_head(), args.message
+        )
+        path = os.path.join(script.versions, f"{revision}_{args.message.lower().replace(' ', '_')[:40]}.py")
+        with open(path, "w") as f:
+            f.write(source)
+        print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Add full-text search indexes for record search
+
+Revision ID: 5b2e9c7d4a13
+Revises: ca301e741ff2
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c7d4a13'
+down_revision: Union[str, None] = 'ca301e741ff2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_COLUMNS = "record_id, client_name, client_phone, client_address"
+
+# Must match app.utils.search.SEARCH_DOCUMENT_SQL
+SEARCH_DOCUMENT_SQL = (
+    "(coalesce(records.record_id, '') || ' ' || coalesce(records.client_name, '') || ' ' || "
+    "coalesce(records.client_phone, '') || ' ' || coalesce(records.client_address, ''))"
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if conn.dialect.name == 'sqlite':
+        # The trigram tokenizer (SQLite 3.34+) gives indexed substring matching,
+        # preserving the old ILIKE '%term%' behaviour; older versions get word prefixes
+        version = tuple(int(part) for part in conn.execute(text("SELECT sqlite_version()")).scalar().split("."))
+        tokenizer = "trigram" if version >= (3, 34) else "unicode61"
+        
+        # External-content FTS5 table over records, keyed by records.id
+        conn.execute(text(f"""
+            CREATE VIRTUAL TABLE records_fts USING fts5(
+                {SEARCH_COLUMNS},
+                content='records', content_rowid='id', tokenize='{tokenizer}'
+            )
+        """))
+        
+        # Keep the index in sync with records
+        conn.execute(text(f"""
+            CREATE TRIGGER records_fts_ai AFTER INSERT ON records BEGIN
+                INSERT INTO records_fts(rowid, {SEARCH_COLUMNS})
+                VALUES (new.id, new.record_id, new.client_name, new.client_phone, new.client_address);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER records_fts_ad AFTER DELETE ON records BEGIN
+                INSERT INTO records_fts(records_fts, rowid, {SEARCH_COLUMNS})
+                VALUES ('delete', old.id, old.record_id, old.client_name, old.client_phone, old.client_address);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER records_fts_au AFTER UPDATE ON records BEGIN
+                INSERT INTO records_fts(records_fts, rowid, {SEARCH_COLUMNS})
+                VALUES ('delete', old.id, old.record_id, old.client_name, old.client_phone, old.client_address);
+                INSERT INTO records_fts(rowid, {SEARCH_COLUMNS})
+                VALUES (new.id, new.record_id, new.client_name, new.client_phone, new.client_address);
+            END
+        """))
+        
+        # Index existing rows
+        conn.execute(text("INSERT INTO records_fts(records_fts) VALUES ('rebuild')"))
+    elif conn.dialect.name == 'postgresql':
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # Trigram index serves ILIKE '%term%' substring search
+        conn.execute(text(
+            f"CREATE INDEX idx_records_search_trgm ON records USING gin ({SEARCH_DOCUMENT_SQL} gin_trgm_ops)"
+        ))
+        # tsvector index serves word-prefix search and ranking
+        conn.execute(text(
+            f"CREATE INDEX idx_records_search_tsv ON records USING gin (to_tsvector('simple', {SEARCH_DOCUMENT_SQL}))"
+        ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text("DROP TRIGGER IF EXISTS records_fts_au"))
+        conn.execute(text("DROP TRIGGER IF EXISTS records_fts_ad"))
+        conn.execute(text("DROP TRIGGER IF EXISTS records_fts_ai"))
+        conn.execute(text("DROP TABLE IF EXISTS records_fts"))
+    elif conn.dialect.name == 'postgresql':
+        conn.execute(text("DROP INDEX IF EXISTS idx_records_search_tsv"))
+        conn.execute(text("DROP INDEX IF EXISTS idx_records_search_trgm"))
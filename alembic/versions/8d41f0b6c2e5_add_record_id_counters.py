@@ -0,0 +1,43 @@
+"""Add record_id_counters table for block-reserved record IDs
+
+Revision ID: 8d41f0b6c2e5
+Revises: 5b2e9c7d4a13
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f0b6c2e5'
+down_revision: Union[str, None] = '5b2e9c7d4a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'record_id_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('next_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    
+    # Seed the counter after the highest RMZ- number already in use
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        condition = "record_id ~ '^RMZ-[0-9]+$'"
+    else:
+        condition = "record_id GLOB 'RMZ-[0-9]*'"
+    conn.execute(text(f"""
+        INSERT INTO record_id_counters (name, next_value)
+        SELECT 'record_id', coalesce(max(CAST(substr(record_id, 5) AS INTEGER)), 0) + 1
+        FROM records WHERE {condition}
+    """))
+
+
+def downgrade() -> None:
+    op.drop_table('record_id_counters')
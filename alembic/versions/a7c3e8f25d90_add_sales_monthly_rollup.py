@@ -0,0 +1,57 @@
+"""Add sales_monthly_rollup table
+
+Revision ID: a7c3e8f25d90
+Revises: 8d41f0b6c2e5
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e8f25d90'
+down_revision: Union[str, None] = '8d41f0b6c2e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_monthly_rollup',
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('zone', sa.String(length=100), nullable=False),
+        sa.Column('sold_by', sa.String(length=200), nullable=False),
+        sa.Column('lead_source', sa.String(length=200), nullable=False),
+        sa.Column('record_count', sa.Integer(), nullable=False),
+        sa.Column('priced_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('highest_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('lowest_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.PrimaryKeyConstraint('month', 'zone', 'sold_by', 'lead_source')
+    )
+    
+    # Populate from existing records (same grouping as app.crud.rebuild_sales_rollup)
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        month = "to_char(date_of_delivery, 'YYYY-MM')"
+    else:
+        month = "strftime('%Y-%m', date_of_delivery)"
+    priced_price = "CASE WHEN sale_price IS NOT NULL AND sale_price != 0 THEN sale_price END"
+    conn.execute(text(f"""
+        INSERT INTO sales_monthly_rollup (
+            month, zone, sold_by, lead_source,
+            record_count, priced_count, revenue, highest_price, lowest_price
+        )
+        SELECT
+            {month}, coalesce(zone, ''), coalesce(sold_by, ''), coalesce(lead_source, ''),
+            count(id), count({priced_price}), sum({priced_price}), max({priced_price}), min({priced_price})
+        FROM records
+        GROUP BY {month}, coalesce(zone, ''), coalesce(sold_by, ''), coalesce(lead_source, '')
+    """))
+
+
+def downgrade() -> None:
+    op.drop_table('sales_monthly_rollup')
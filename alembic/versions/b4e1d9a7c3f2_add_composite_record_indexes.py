@@ -0,0 +1,35 @@
+"""Add composite (filter, date_of_delivery, id) record indexes
+
+Record listings filter by zone or sold_by and sort by date_of_delivery, id.
+Composite indexes let the database read a page in index order instead of
+filtering one single-column index and sorting every match. They replace
+idx_zone and idx_sold_by, which are prefixes of them.
+
+Revision ID: b4e1d9a7c3f2
+Revises: a7c3e8f25d90
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e1d9a7c3f2'
+down_revision: Union[str, None] = 'a7c3e8f25d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_zone_date_of_delivery_id', 'records', ['zone', 'date_of_delivery', 'id'])
+    op.create_index('idx_sold_by_date_of_delivery_id', 'records', ['sold_by', 'date_of_delivery', 'id'])
+    op.drop_index('idx_zone', table_name='records')
+    op.drop_index('idx_sold_by', table_name='records')
+
+
+def downgrade() -> None:
+    op.create_index('idx_sold_by', 'records', ['sold_by'])
+    op.create_index('idx_zone', 'records', ['zone'])
+    op.drop_index('idx_sold_by_date_of_delivery_id', table_name='records')
+    op.drop_index('idx_zone_date_of_delivery_id', table_name='records')
@@ -0,0 +1,27 @@
+"""Add records.updated_at index
+
+max(updated_at) is part of the validator behind ETag / 304 responses on the
+read endpoints; the index turns it into a single index lookup.
+
+Revision ID: c9d2f4a61b07
+Revises: b4e1d9a7c3f2
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d2f4a61b07'
+down_revision: Union[str, None] = 'b4e1d9a7c3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_updated_at', 'records', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_updated_at', table_name='records')
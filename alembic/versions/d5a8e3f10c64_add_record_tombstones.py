@@ -0,0 +1,38 @@
+"""Add record_tombstones table for delta sync
+
+Deleted records leave a tombstone so GET /records/changes can report them;
+changed records are found through the existing idx_updated_at index.
+
+Revision ID: d5a8e3f10c64
+Revises: c9d2f4a61b07
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e3f10c64'
+down_revision: Union[str, None] = 'c9d2f4a61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'record_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('record_pk', sa.Integer(), nullable=False),
+        sa.Column('record_id', sa.String(length=50), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    op.create_index('idx_record_tombstones_deleted_at', 'record_tombstones', ['deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_record_tombstones_deleted_at', table_name='record_tombstones')
+    op.drop_table('record_tombstones')
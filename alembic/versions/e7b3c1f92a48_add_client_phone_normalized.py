@@ -0,0 +1,70 @@
+"""Add records.client_phone_normalized with backfill and history index
+
+Client history and phone search match numbers stored in different formats
+through the normalized digits. The (client_phone_normalized, date_of_delivery)
+index serves history pages and client summaries, and replaces idx_client_phone,
+which nothing filters on any more.
+
+Revision ID: e7b3c1f92a48
+Revises: d5a8e3f10c64
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c1f92a48'
+down_revision: Union[str, None] = 'd5a8e3f10c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _normalize_phone(phone):
+    # Copy of app.utils.phone.normalize_phone as of this revision
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone).lstrip("0")
+    if digits.startswith("91") and len(digits[2:].lstrip("0")) == 10:
+        digits = digits[2:].lstrip("0")
+    return digits or None
+
+
+def upgrade() -> None:
+    op.add_column('records', sa.Column('client_phone_normalized', sa.String(length=20), nullable=True))
+
+    conn = op.get_bind()
+    records = sa.table('records', sa.column('id', sa.Integer), sa.column('client_phone', sa.String),
+                       sa.column('client_phone_normalized', sa.String))
+    update = records.update().where(records.c.id == sa.bindparam('row_id')).values(
+        client_phone_normalized=sa.bindparam('normalized')
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(records.c.id, records.c.client_phone)
+            .where(records.c.id > last_id, records.c.client_phone.isnot(None))
+            .order_by(records.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [
+            {'row_id': row_id, 'normalized': _normalize_phone(phone)} for row_id, phone in rows
+        ])
+        last_id = rows[-1][0]
+
+    op.create_index('idx_client_phone_normalized_date_of_delivery', 'records',
+                    ['client_phone_normalized', 'date_of_delivery'])
+    op.drop_index('idx_client_phone', table_name='records')
+
+
+def downgrade() -> None:
+    op.create_index('idx_client_phone', 'records', ['client_phone'])
+    op.drop_index('idx_client_phone_normalized_date_of_delivery', table_name='records')
+    op.drop_column('records', 'client_phone_normalized')
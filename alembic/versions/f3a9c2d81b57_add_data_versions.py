@@ -0,0 +1,38 @@
+"""Add data_versions table for cache invalidation across worker processes
+
+Record writes bump the 'records' version (and 'filter_options' when they
+touch a filterable column) in their own transaction; caches in every
+process compare it with the version they were built at.
+
+Revision ID: f3a9c2d81b57
+Revises: e7b3c1f92a48
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d81b57'
+down_revision: Union[str, None] = 'e7b3c1f92a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    data_versions = op.create_table(
+        'data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(data_versions, [
+        {'name': 'records', 'version': 0},
+        {'name': 'filter_options', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
@@ -11,11 +11,75 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./maintenance_crm.db")
+    # Serve API routes through an AsyncSession (needs aiosqlite or asyncpg); scripts always use the sync engine
+    use_async_db: bool = False
+    
+    # Connection pool (PostgreSQL and other server databases)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    
+    # SQLite tuning, applied to every new connection
+    sqlite_journal_mode: str = "WAL"  # readers no longer block on writers
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL, far fewer fsyncs than FULL
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456  # bytes
     
     # JWT settings
     jwt_algorithm: str = "HS256"
     jwt_expire_hours: int = 24
     
+    # Record IDs reserved per process per allocator round trip
+    record_id_block_size: int = 20
+    
+    # Serve /sales/summary from sales_monthly_rollup when filters cover whole months
+    use_sales_rollup: bool = True
+    # Serve /sales/summary from an in-memory columnar snapshot of records (any non-search filters)
+    use_sales_snapshot: bool = False
+    sales_snapshot_max_age: int = 30  # seconds before picking up writes made outside the app (scripts, SQL)
+    
+    # Caching
+    filter_options_cache_ttl: int = 300  # seconds; bounds staleness from writes made outside the app
+    validator_cache_ttl: float = 1.0  # seconds the ETag inputs (count, max(updated_at)) are reused; 0 = every request
+    response_cache_enabled: bool = True  # cache /sales/summary responses until records change
+    # "memory" (entries per process) or "redis" (entries shared); both are invalidated through
+    # the data_versions table, so writes in any worker process are seen by all of them
+    response_cache_backend: str = "memory"
+    response_cache_ttl: int = 300  # seconds
+    response_cache_max_entries: int = 256
+    redis_url: Optional[str] = None
+    
+    # PDF exports: rows per chunk rendered in a worker process; 0 workers = one per CPU
+    pdf_export_rows_per_chunk: int = 2000
+    pdf_export_workers: int = 0
+    
+    # Background export jobs (POST /export/jobs)
+    export_dir: str = "./exports"
+    export_job_workers: int = 2  # also render the GET /export/*.pdf downloads
+    export_job_ttl: int = 3600  # seconds an artifact stays downloadable
+    
+    # Delta sync (GET /records/changes)
+    sync_lag_seconds: float = 5.0  # changes newer than this wait for the next sync (commit order, timestamp resolution)
+    sync_tombstone_retention_days: int = 90  # older cursors must sync from scratch
+    
+    # Response compression (brotli needs the brotli package; gzip otherwise)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # bytes; smaller responses are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli: bool = True
+    compression_brotli_quality: int = 4  # 0-11; low qualities are fast enough for dynamic responses
+    
+    # Per-request instrumentation: /metrics (Prometheus) and Server-Timing headers
+    metrics_enabled: bool = True
+    # Bearer token a Prometheus scraper can send to /metrics; a maintenance or sales login token also works
+    metrics_token: Optional[str] = None
+    # Append the filter/sort shape of every records listing and export to this JSON Lines
+    # file (column names only, no values) for the index advisor (advise_indexes.py)
+    query_log_path: Optional[str] = None
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,41 +1,166 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_, and_, func, desc, case, select, insert, update, delete, literal, union_all, type_coerce, String, DateTime
 from typing import Optional
-from datetime import datetime, date
-from app.models import Record
+import time
+from datetime import datetime, date, timedelta
+from app.models import Record, RecordTombstone, SalesMonthlyRollup, DataVersion
 from app.schemas import RecordCreate, RecordUpdate, RecordFilters
-from app.utils.warranty import get_warranty_status
+from app.utils.warranty import WARRANTY_DAYS, get_warranty_cutoffs
+from app.utils.pagination import (
+    KEYSET_SORT_COLUMNS, CursorExpired, decode_cursor, cursor_for, encode_sync_cursor, decode_sync_cursor
+)
+from app.utils.search import search_condition, search_rank
+from app.utils.query_log import log_query
+from app.utils.cache import sales_summary_cache
+from app.utils.analytics import sales_snapshot, delivery_date_bounds
+from app.utils.id_allocator import get_allocator, format_record_id, parse_record_number
+from app.utils.phone import normalize_phone
+from app.config import settings
+
+# Response keys of /filters/options and the columns they list
+FILTER_OPTION_FIELDS = {
+    "zones": "zone",
+    "capacity_kw": "capacity_kw",
+    "heaters": "heater",
+    "controllers": "controller",
+    "cards": "card",
+    "bodies": "body",
+    "sold_by": "sold_by",
+    "lead_sources": "lead_source",
+}
+
+
+def _record_id_allocator(db: Session):
+    """Process-wide record ID allocator for the session's engine"""
+    return get_allocator(db.get_bind(), settings.record_id_block_size)
 
 
 def generate_record_id(db: Session) -> str:
     """Generate next record ID in format RMZ-000001"""
-    last_record = db.query(Record).order_by(Record.id.desc()).first()
-    if last_record and last_record.record_id.startswith("RMZ-"):
-        try:
-            num = int(last_record.record_id.split("-")[1])
-            next_num = num + 1
-        except (ValueError, IndexError):
-            next_num = 1
-    else:
-        next_num = 1
-    return f"RMZ-{next_num:06d}"
+    return format_record_id(_record_id_allocator(db).allocate(1, db)[0])
+
+
+def allocate_record_ids(db: Session, count: int) -> list[str]:
+    """Allocate a block of record IDs (a shared counter update only when the process's reserved block runs out)"""
+    if count <= 0:
+        return []
+    return [format_record_id(num) for num in _record_id_allocator(db).allocate(count, db)]
+
+
+def reserve_record_ids(db: Session, record_ids: list[str]) -> None:
+    """Keep explicitly supplied RMZ- IDs from being generated again"""
+    numbers = [num for num in map(parse_record_number, record_ids) if num is not None]
+    if numbers:
+        _record_id_allocator(db).advance_past(max(numbers), db)
+
+
+def discard_record_id_block(db: Session) -> None:
+    """Stop handing out the rest of this process's reserved ID block (after one of its IDs was taken)"""
+    _record_id_allocator(db).discard_block()
+
+
+def bump_data_versions(db: Session, *names: str) -> None:
+    """Increment data versions in the session's transaction, so they change when the write commits"""
+    for name in names:
+        result = db.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            # First write to a database without the seeded row (e.g. tables made by create_all)
+            try:
+                with db.begin_nested():
+                    db.add(DataVersion(name=name, version=1))
+            except IntegrityError:
+                db.execute(
+                    update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1)
+                )
+
+
+def get_data_version(db: Session, name: str) -> int:
+    """Committed version of a kind of data (0 before its first write)"""
+    return db.query(DataVersion.version).filter(DataVersion.name == name).scalar() or 0
 
 
 def create_record(db: Session, record: RecordCreate, auto_generate_id: bool = True) -> Record:
     """Create a new record"""
-    record_data = record.model_dump()
-    
+    generated = auto_generate_id or not record.record_id
+    try:
+        return _insert_record(db, record.model_dump(), generated)
+    except IntegrityError:
+        db.rollback()
+        if not generated:
+            raise
+        # Another process inserted an explicit ID from this process's block; retry from a fresh block
+        discard_record_id_block(db)
+        return _insert_record(db, record.model_dump(), generated)
+
+
+def _insert_record(db: Session, record_data: dict, generated: bool) -> Record:
     # Auto-generate record_id if not provided or if auto_generate_id is True
-    if auto_generate_id or not record_data.get("record_id"):
+    if generated:
         record_data["record_id"] = generate_record_id(db)
+    else:
+        reserve_record_ids(db, [record_data["record_id"]])
+    record_data["client_phone_normalized"] = normalize_phone(record_data.get("client_phone"))
     
     db_record = Record(**record_data)
     db.add(db_record)
+    db.flush()
+    refresh_rollup_buckets(db, {rollup_bucket(db_record)})
+    if any(record_data.get(column) is not None for column in FILTER_OPTION_FIELDS.values()):
+        bump_data_versions(db, "records", "filter_options")
+    else:
+        bump_data_versions(db, "records")
     db.commit()
     db.refresh(db_record)
     return db_record
 
 
+def bulk_insert_records(db: Session, records: list[dict]) -> list[Optional[str]]:
+    """Insert validated record dicts in one executemany transaction.
+    
+    If the batch violates a constraint (e.g. a duplicate record_id), it is
+    retried row by row inside savepoints so only the offending rows fail.
+    Returns one error message (or None) per input record.
+    """
+    if not records:
+        return []
+    for record_data in records:
+        record_data["client_phone_normalized"] = normalize_phone(record_data.get("client_phone"))
+    
+    # Core insert so the whole batch is one executemany; the ORM bulk path
+    # splits batches into one statement per distinct pattern of None values
+    try:
+        db.execute(insert(Record.__table__), records)
+        errors = [None] * len(records)
+    except IntegrityError:
+        db.rollback()
+        # On SQLite the rollback also undid ID reservations made in this transaction
+        reserve_record_ids(db, [record_data["record_id"] for record_data in records])
+        errors = []
+        for record_data in records:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Record.__table__), [record_data])
+                errors.append(None)
+            except IntegrityError as e:
+                errors.append(str(e.orig))
+    
+    refresh_rollup_buckets(db, {
+        rollup_bucket(record_data) for record_data, error in zip(records, errors) if error is None
+    })
+    if any(error is None for error in errors):
+        bump_data_versions(db, "records")
+    if any(
+        error is None and any(record_data.get(column) is not None for column in FILTER_OPTION_FIELDS.values())
+        for record_data, error in zip(records, errors)
+    ):
+        bump_data_versions(db, "filter_options")
+    db.commit()
+    return errors
+
+
 def get_record(db: Session, record_id: int) -> Optional[Record]:
     """Get record by ID"""
     return db.query(Record).filter(Record.id == record_id).first()
@@ -52,11 +177,22 @@ def update_record(db: Session, record_id: int, record_update: RecordUpdate) -> O
     if not db_record:
         return None
     
+    old_bucket = rollup_bucket(db_record)
     update_data = record_update.model_dump(exclude_unset=True)
+    if update_data.get("record_id") and update_data["record_id"] != db_record.record_id:
+        reserve_record_ids(db, [update_data["record_id"]])
     for field, value in update_data.items():
         setattr(db_record, field, value)
+    if "client_phone" in update_data:
+        db_record.client_phone_normalized = normalize_phone(db_record.client_phone)
     
     db_record.updated_at = datetime.utcnow()
+    db.flush()
+    refresh_rollup_buckets(db, {old_bucket, rollup_bucket(db_record)})
+    if update_data.keys() & set(FILTER_OPTION_FIELDS.values()):
+        bump_data_versions(db, "records", "filter_options")
+    else:
+        bump_data_versions(db, "records")
     db.commit()
     db.refresh(db_record)
     return db_record
@@ -67,33 +203,31 @@ def delete_record(db: Session, record_id: int) -> bool:
     db_record = get_record(db, record_id)
     if not db_record:
         return False
+    touches_filter_options = any(
+        getattr(db_record, column) is not None for column in FILTER_OPTION_FIELDS.values()
+    )
+    bucket = rollup_bucket(db_record)
+    # Tombstone for delta sync clients, in the same transaction as the delete
+    db.add(RecordTombstone(record_pk=db_record.id, record_id=db_record.record_id))
+    db.execute(delete(RecordTombstone).where(
+        RecordTombstone.deleted_at < datetime.utcnow() - timedelta(days=settings.sync_tombstone_retention_days)
+    ))
     db.delete(db_record)
+    db.flush()
+    refresh_rollup_buckets(db, {bucket})
+    if touches_filter_options:
+        bump_data_versions(db, "records", "filter_options")
+    else:
+        bump_data_versions(db, "records")
     db.commit()
     return True
 
 
-def get_records(
-    db: Session,
-    filters: RecordFilters,
-    page: int = 1,
-    page_size: int = 50,
-    sort_by: str = "date_of_delivery",
-    sort_desc: bool = True
-) -> tuple[list[Record], int]:
-    """Get records with filters, search, pagination, and sorting"""
-    query = db.query(Record)
-    
+def _apply_filters(query, filters: RecordFilters):
+    """Apply search and column filters from RecordFilters to a query"""
     # Search (record_id, client_name, client_phone, client_address)
-    if filters.search:
-        search_term = f"%{filters.search}%"
-        query = query.filter(
-            or_(
-                Record.record_id.ilike(search_term),
-                Record.client_name.ilike(search_term),
-                Record.client_phone.ilike(search_term),
-                Record.client_address.ilike(search_term)
-            )
-        )
+    if filters.search and filters.search.strip():
+        query = query.filter(search_condition(query.session, filters.search))
     
     # Filters
     if filters.zone:
@@ -119,15 +253,48 @@ def get_records(
     if filters.date_to:
         query = query.filter(Record.date_of_delivery <= filters.date_to)
     
+    return query
+
+
+def _with_sort_column(columns: list, sort_by: str) -> list:
+    """columns plus the keyset sort column (appended last) if it is not selected"""
+    if sort_by in KEYSET_SORT_COLUMNS and all(column.key != sort_by for column in columns):
+        return list(columns) + [getattr(Record, sort_by)]
+    return columns
+
+
+def get_records(
+    db: Session,
+    filters: RecordFilters,
+    page: int = 1,
+    page_size: int = 50,
+    sort_by: str = "date_of_delivery",
+    sort_desc: bool = True,
+    columns: Optional[list] = None
+) -> tuple[list[Record], int]:
+    """Get records with filters, search, pagination, and sorting.
+    
+    With columns, returns rows of those columns instead of Record instances
+    (plus the sort column, if keyset-capable, so cursor_for works on them).
+    """
+    log_query("list", filters, sort_by, sort_desc)
+    if columns:
+        columns = _with_sort_column(columns, sort_by)
+    query = _apply_filters(db.query(*columns) if columns else db.query(Record), filters)
+    
     # Get total count before pagination
     total = query.count()
     
-    # Sorting
-    sort_column = getattr(Record, sort_by, Record.date_of_delivery)
+    # Sorting (id breaks ties so pages line up with keyset cursors)
+    sort_column = None
+    if sort_by == "relevance" and filters.search:
+        sort_column = search_rank(db, filters.search)
+    if sort_column is None:
+        sort_column = getattr(Record, sort_by, Record.date_of_delivery)
     if sort_desc:
-        query = query.order_by(desc(sort_column))
+        query = query.order_by(desc(sort_column), desc(Record.id))
     else:
-        query = query.order_by(sort_column)
+        query = query.order_by(sort_column, Record.id)
     
     # Pagination
     offset = (page - 1) * page_size
@@ -136,14 +303,114 @@ def get_records(
     return records, total
 
 
+def _keyset_sort(db: Session, sort_by: str, last_value=None):
+    """Sort expression and cursor value to compare it with, for keyset pagination.
+    
+    SQLite compares DATETIME values as text, and rows stamped by func.now()
+    lack the microseconds SQLAlchemy writes ('... 10:00:00' sorts before
+    '... 10:00:00.000000'), so both sides are compared as full microsecond text.
+    """
+    sort_column = getattr(Record, sort_by)
+    if db.get_bind().dialect.name == "sqlite" and isinstance(sort_column.type, DateTime):
+        sort_column = func.substr(type_coerce(sort_column, String) + ".000000", 1, 26)
+        if last_value is not None:
+            last_value = last_value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return sort_column, last_value
+
+
+def get_records_after(
+    db: Session,
+    filters: RecordFilters,
+    cursor: Optional[str] = None,
+    page_size: int = 50,
+    sort_by: str = "date_of_delivery",
+    sort_desc: bool = True,
+    include_total: bool = False,
+    columns: Optional[list] = None
+) -> tuple[list[Record], Optional[int], Optional[str]]:
+    """Get one page of records using keyset (cursor) pagination.
+    
+    Seeks past (sort column, id) of the previous page instead of using OFFSET,
+    so every page costs the same. An empty cursor starts from the first page;
+    a non-empty cursor carries its own sort order. Returns
+    (records, total or None, next_cursor or None); with columns, records are
+    rows of those columns (which must include id) followed by the sort column.
+    Raises ValueError for an invalid cursor or a sort column that cannot be keyed.
+    """
+    if cursor:
+        sort_by, sort_desc, last_value, last_id = decode_cursor(cursor)
+    elif sort_by not in KEYSET_SORT_COLUMNS:
+        raise ValueError(f"Cursor pagination is not supported when sorting by {sort_by}")
+    
+    log_query("cursor", filters, sort_by, sort_desc)
+    if columns:
+        columns = _with_sort_column(columns, sort_by)
+    query = _apply_filters(db.query(*columns) if columns else db.query(Record), filters)
+    total = query.count() if include_total else None
+    
+    sort_column, last_value = _keyset_sort(db, sort_by, last_value if cursor else None)
+    if cursor:
+        if sort_desc:
+            query = query.filter(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, Record.id < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, Record.id > last_id)
+            ))
+    
+    if sort_desc:
+        query = query.order_by(desc(sort_column), desc(Record.id))
+    else:
+        query = query.order_by(sort_column, Record.id)
+    
+    # Fetch one extra row to know whether another page exists
+    records = query.limit(page_size + 1).all()
+    has_more = len(records) > page_size
+    records = records[:page_size]
+    
+    next_cursor = cursor_for(records, sort_by, sort_desc) if has_more else None
+    return records, total, next_cursor
+
+
+def iter_record_rows(
+    db: Session,
+    filters: RecordFilters,
+    columns: list,
+    sort_by: str = "date_of_delivery",
+    sort_desc: bool = True,
+    chunk_size: int = 1000
+):
+    """Yield column tuples for all matching records, fetched in chunks.
+    
+    Uses yield_per so PostgreSQL streams through a server-side cursor and no
+    ORM instances are built; memory stays bounded by chunk_size.
+    """
+    log_query("export", filters, sort_by, sort_desc)
+    query = _apply_filters(db.query(*columns), filters)
+    
+    sort_column = getattr(Record, sort_by, Record.date_of_delivery)
+    if sort_desc:
+        query = query.order_by(desc(sort_column), desc(Record.id))
+    else:
+        query = query.order_by(sort_column, Record.id)
+    
+    yield from query.yield_per(chunk_size)
+
+
 def get_records_by_client_phone(
     db: Session,
     client_phone: str,
     exclude_id: Optional[int] = None,
     limit: int = 10
 ) -> list[Record]:
-    """Get records by exact client phone match, sorted by date descending (newest first)"""
-    query = db.query(Record).filter(Record.client_phone == client_phone)
+    """Get records by client phone in any format, sorted by date descending (newest first)"""
+    normalized = normalize_phone(client_phone)
+    if normalized is None:
+        return []
+    query = db.query(Record).filter(Record.client_phone_normalized == normalized)
     
     if exclude_id:
         query = query.filter(Record.id != exclude_id)
@@ -154,6 +421,148 @@ def get_records_by_client_phone(
     return records
 
 
+def get_client_summary(db: Session, client_phone: str) -> Optional[dict]:
+    """Order count, revenue and latest dates of one client (phone in any format), or None if unknown"""
+    normalized = normalize_phone(client_phone)
+    if normalized is None:
+        return None
+    # One statement over the idx_client_phone_normalized_date_of_delivery range
+    latest_name = select(Record.client_name).where(Record.client_phone_normalized == normalized).order_by(
+        desc(Record.date_of_delivery), desc(Record.id)
+    ).limit(1).scalar_subquery()
+    row = db.execute(
+        select(
+            latest_name,
+            func.count(Record.id),
+            func.count(_priced_revenue()),
+            func.sum(_priced_revenue()),
+            func.min(Record.date_of_delivery),
+            func.max(Record.date_of_delivery),
+            func.max(Record.date_of_installation),
+            func.max(Record.date_of_site_visit),
+        ).where(Record.client_phone_normalized == normalized)
+    ).one()
+    client_name, order_count, priced_count, revenue, first_order, last_order, last_installation, last_visit = row
+    if not order_count:
+        return None
+    
+    service_dates = [day for day in (last_installation, last_visit.date() if last_visit else None) if day]
+    return {
+        "client_phone": normalized,
+        "client_name": client_name,
+        "order_count": order_count,
+        "priced_count": priced_count,
+        "lifetime_revenue": float(revenue) if revenue is not None else 0.0,
+        "average_order_value": float(revenue) / priced_count if priced_count else None,
+        "first_order": first_order,
+        "last_order": last_order,
+        "last_service": max(service_dates) if service_dates else None,
+    }
+
+
+def get_filter_options(db: Session) -> dict[str, list[str]]:
+    """Distinct non-null values of every filter column, in one UNION ALL query"""
+    selects = [
+        select(literal(key, String).label("field"), getattr(Record, column).label("value"))
+        .where(getattr(Record, column).isnot(None))
+        .distinct()
+        for key, column in FILTER_OPTION_FIELDS.items()
+    ]
+    
+    options = {key: [] for key in FILTER_OPTION_FIELDS}
+    for field, value in db.execute(union_all(*selects).order_by("field", "value")):
+        options[field].append(value)
+    return options
+
+
+def get_records_validator(db: Session) -> tuple[int, Optional[datetime], datetime]:
+    """Row count, newest updated_at and the database clock, for conditional GETs"""
+    # Separate subqueries: a lone max() is a single idx_updated_at lookup, not a scan
+    count, last_updated, now = db.execute(select(
+        select(func.count(Record.id)).scalar_subquery(),
+        select(func.max(Record.updated_at)).scalar_subquery(),
+        func.now()
+    )).one()
+    # PostgreSQL now() is timezone-aware; updated_at holds the same clock without a zone
+    return count, last_updated, now.replace(tzinfo=None)
+
+
+def get_record_changes(
+    db: Session,
+    columns: list,
+    cursor: Optional[str] = None,
+    limit: int = 500
+) -> tuple[list, list, str, bool]:
+    """Get one batch of records changed and deleted since a sync cursor.
+    
+    Without a cursor, every record is sent (deletions made before the first
+    sync are skipped). Deletions are sent before changed records, so a client
+    that deletes then upserts each batch also handles a reused id. Changes
+    newer than sync_lag_seconds are left for the next call, so transactions
+    that commit late and same-second updated_at values are not skipped.
+    Returns (rows, tombstones, next_cursor, has_more); rows are of columns
+    (which must include id) followed by the sync key. Raises ValueError for an
+    invalid cursor and CursorExpired if its tombstones may have been pruned.
+    """
+    now = db.scalar(select(func.now())).replace(tzinfo=None)
+    bound = now - timedelta(seconds=settings.sync_lag_seconds)
+    if cursor:
+        last_updated, last_id, last_tombstone, synced_until = decode_sync_cursor(cursor)
+        if synced_until < now - timedelta(days=settings.sync_tombstone_retention_days):
+            raise CursorExpired("Sync cursor has expired; sync again without a cursor")
+    else:
+        last_updated = last_id = None
+        last_tombstone = db.scalar(select(func.max(RecordTombstone.id))) or 0
+    
+    # SQLite stores updated_at as text with or without a fraction, which the DateTime
+    # type would not round-trip; seek on the stored text itself (still idx_updated_at)
+    if db.get_bind().dialect.name == "sqlite":
+        sync_key = type_coerce(Record.updated_at, String)
+        bound_value = bound.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        sync_key = Record.updated_at
+        bound_value = bound
+        if last_updated is not None:
+            last_updated = datetime.fromisoformat(last_updated)
+    
+    # Tombstones in id order, stopping at the first one inside the lag
+    tombstones = []
+    for tombstone in db.execute(
+        select(RecordTombstone.id, RecordTombstone.record_pk, RecordTombstone.record_id, RecordTombstone.deleted_at)
+        .where(RecordTombstone.id > last_tombstone)
+        .order_by(RecordTombstone.id)
+        .limit(limit)
+    ):
+        if tombstone.deleted_at >= bound:
+            break
+        tombstones.append(tombstone)
+    if tombstones:
+        last_tombstone = tombstones[-1].id
+    
+    rows = []
+    has_more = len(tombstones) >= limit
+    if not has_more:
+        remaining = limit - len(tombstones)
+        query = db.query(*columns, sync_key.label("sync_key")).filter(sync_key < bound_value)
+        if last_updated is not None:
+            # Range on the index, then the tie-break: a plain OR of the two cases is
+            # planned as two index searches whose union is sorted again for every batch
+            query = query.filter(
+                sync_key >= last_updated,
+                or_(sync_key > last_updated, Record.id > last_id)
+            )
+        rows = query.order_by(sync_key, Record.id).limit(remaining + 1).all()
+        has_more = len(rows) > remaining
+        rows = rows[:remaining]
+        if rows:
+            last_updated, last_id = rows[-1].sync_key, rows[-1].id
+    
+    if isinstance(last_updated, datetime):
+        last_updated = last_updated.isoformat()
+    next_cursor = encode_sync_cursor(last_updated, last_id, last_tombstone, bound)
+    return rows, tombstones, next_cursor, has_more
+
+
 def get_records_out_of_warranty(db: Session, page: int = 1, page_size: int = 50) -> tuple[list[Record], int]:
     """Get records that are out of warranty"""
     from datetime import timedelta, date
@@ -185,158 +594,355 @@ def get_records_expiring_soon(db: Session, days: int = 30, page: int = 1, page_s
     return records, total
 
 
-def get_warranty_summary(db: Session, days_soon: int = 30) -> dict:
-    """Get warranty summary counts"""
-    all_records = db.query(Record).filter(Record.date_of_delivery.isnot(None)).all()
+def get_warranty_summary(db: Session, days_soon: int = 30, breakdown: Optional[str] = None) -> dict:
+    """Get warranty summary counts with a single conditional-aggregate query.
     
-    in_warranty = 0
-    out_of_warranty = 0
-    expiring_soon = 0
+    breakdown may be "zone" or "month" (warranty expiry month) to also return
+    per-group counts; totals are then summed from the grouped rows.
+    """
+    expired_before, expiring_by = get_warranty_cutoffs(days_soon)
     
-    for record in all_records:
-        _, status = get_warranty_status(record, days_soon)
-        if status == "in_warranty":
-            in_warranty += 1
-        elif status == "expiring_soon":
-            expiring_soon += 1
-        else:
-            out_of_warranty += 1
+    columns = [
+        func.count(Record.id),
+        func.sum(case((Record.date_of_delivery < expired_before, 1), else_=0)),
+        func.sum(case(
+            (and_(Record.date_of_delivery >= expired_before, Record.date_of_delivery <= expiring_by), 1),
+            else_=0
+        )),
+        func.sum(case((Record.date_of_delivery > expiring_by, 1), else_=0)),
+    ]
     
-    return {
-        "in_warranty": in_warranty,
-        "out_of_warranty": out_of_warranty,
-        "expiring_soon": expiring_soon,
-        "total": len(all_records)
-    }
+    group_column = None
+    if breakdown == "zone":
+        group_column = Record.zone
+    elif breakdown == "month":
+        group_column = month_key(db, Record.date_of_delivery, days_offset=WARRANTY_DAYS)
+    
+    query = db.query(*columns) if group_column is None else db.query(group_column, *columns)
+    query = query.filter(Record.date_of_delivery.isnot(None))
+    
+    if group_column is None:
+        rows = [(None, *query.one())]
+    else:
+        rows = query.group_by(group_column).order_by(group_column).all()
+    
+    summary = {"in_warranty": 0, "out_of_warranty": 0, "expiring_soon": 0, "total": 0}
+    groups = {}
+    for key, total, out_of_warranty, expiring_soon, in_warranty in rows:
+        counts = {
+            "in_warranty": in_warranty or 0,
+            "out_of_warranty": out_of_warranty or 0,
+            "expiring_soon": expiring_soon or 0,
+            "total": total or 0
+        }
+        for field, value in counts.items():
+            summary[field] += value
+        if group_column is not None:
+            group = groups.setdefault(key or "Unknown", dict.fromkeys(counts, 0))
+            for field, value in counts.items():
+                group[field] += value
+    
+    if breakdown == "zone":
+        summary["by_zone"] = groups
+    elif breakdown == "month":
+        summary["by_month"] = groups
+    
+    return summary
 
 
-def get_sales_summary(db: Session, filters: Optional[RecordFilters] = None) -> dict:
-    """Get sales summary with totals, breakdowns, trends, and projections"""
-    from datetime import timedelta
-    from collections import defaultdict
+def month_key(db: Session, column, days_offset: int = 0):
+    """SQL expression formatting a date column (shifted by days_offset) as 'YYYY-MM' for the session's dialect"""
+    if db.get_bind().dialect.name == "postgresql":
+        if days_offset:
+            column = column + days_offset
+        return func.to_char(column, "YYYY-MM")
+    if days_offset:
+        return func.strftime("%Y-%m", column, f"{days_offset:+d} days")
+    return func.strftime("%Y-%m", column)
+
+
+def _priced():
+    """Condition matching records that count as priced (non-null, non-zero sale_price)"""
+    return and_(Record.sale_price.isnot(None), Record.sale_price != 0)
+
+
+def _priced_revenue():
+    """Sale price for priced records, NULL otherwise (for SUM/MIN/MAX)"""
+    return case((_priced(), Record.sale_price), else_=None)
+
+
+def rollup_bucket(record) -> tuple[str, str, str, str]:
+    """Rollup key (month, zone, sold_by, lead_source) of a Record or record dict"""
+    get = record.get if isinstance(record, dict) else lambda field: getattr(record, field)
+    return (
+        get("date_of_delivery").strftime("%Y-%m"),
+        get("zone") or "",
+        get("sold_by") or "",
+        get("lead_source") or ""
+    )
+
+
+def _rollup_select(db: Session):
+    """SELECT producing sales_monthly_rollup rows grouped from records"""
+    month = month_key(db, Record.date_of_delivery)
+    dimensions = [
+        func.coalesce(Record.zone, ""),
+        func.coalesce(Record.sold_by, ""),
+        func.coalesce(Record.lead_source, "")
+    ]
+    return select(
+        month,
+        *dimensions,
+        func.count(Record.id),
+        func.count(_priced_revenue()),
+        func.sum(_priced_revenue()),
+        func.max(_priced_revenue()),
+        func.min(_priced_revenue())
+    ).group_by(month, *dimensions)
+
+
+ROLLUP_COLUMNS = [
+    "month", "zone", "sold_by", "lead_source",
+    "record_count", "priced_count", "revenue", "highest_price", "lowest_price"
+]
+
+
+def refresh_rollup_buckets(db: Session, buckets: set[tuple[str, str, str, str]]) -> None:
+    """Recompute the given rollup buckets from records inside the caller's transaction.
     
-    query = db.query(Record)
+    Each bucket covers one month of date_of_delivery, so the recompute reads
+    only that month's rows via idx_date_of_delivery. On PostgreSQL a
+    transaction-scoped advisory lock per bucket serializes concurrent
+    writers so neither overwrites the other's counts.
+    """
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    
+    for month, zone, sold_by, lead_source in sorted(buckets):
+        if is_postgres:
+            bucket_key = "|".join(("sales_monthly_rollup", month, zone, sold_by, lead_source))
+            db.execute(select(func.pg_advisory_xact_lock(func.hashtext(bucket_key))))
+        
+        db.execute(
+            SalesMonthlyRollup.__table__.delete().where(
+                SalesMonthlyRollup.month == month,
+                SalesMonthlyRollup.zone == zone,
+                SalesMonthlyRollup.sold_by == sold_by,
+                SalesMonthlyRollup.lead_source == lead_source
+            )
+        )
+        
+        year, month_num = (int(part) for part in month.split("-"))
+        month_start = date(year, month_num, 1)
+        next_month = date(year + month_num // 12, month_num % 12 + 1, 1)
+        bucket_rows = _rollup_select(db).where(
+            Record.date_of_delivery >= month_start,
+            Record.date_of_delivery < next_month,
+            func.coalesce(Record.zone, "") == zone,
+            func.coalesce(Record.sold_by, "") == sold_by,
+            func.coalesce(Record.lead_source, "") == lead_source
+        )
+        db.execute(insert(SalesMonthlyRollup).from_select(ROLLUP_COLUMNS, bucket_rows))
+
+
+def rebuild_sales_rollup(db: Session) -> int:
+    """Rebuild sales_monthly_rollup from scratch; returns the number of buckets"""
+    db.execute(SalesMonthlyRollup.__table__.delete())
+    db.execute(insert(SalesMonthlyRollup).from_select(ROLLUP_COLUMNS, _rollup_select(db)))
+    db.commit()
+    return db.query(func.count()).select_from(SalesMonthlyRollup).scalar()
+
+
+def ensure_sales_rollup(db: Session) -> None:
+    """Build the rollup if it is empty while records exist (e.g. tables made by create_all)"""
+    if db.query(SalesMonthlyRollup.month).first() is None and db.query(Record.id).first() is not None:
+        rebuild_sales_rollup(db)
+
+
+def _rollup_month_range(
+    filters: Optional[RecordFilters], dialect: str
+) -> Optional[tuple[Optional[str], Optional[str]]]:
+    """
+    (first_month, last_month) covered by the filters if the rollup can answer
+    them exactly, else None. Only zone, sold_by and whole-month date ranges
+    qualify: the SQL date filters must start on a month's 1st and end on a
+    month's last day (see delivery_date_bounds for where they start on SQLite).
+    """
+    if filters is None:
+        return None, None
+    
+    other_filters = filters.model_dump(exclude={"zone", "sold_by", "date_from", "date_to"})
+    if any(other_filters.values()):
+        return None
+    
+    first_day, last_day = delivery_date_bounds(filters, dialect)
+    first_month = last_month = None
+    if first_day:
+        if first_day.day != 1:
+            return None
+        first_month = first_day.strftime("%Y-%m")
+    if last_day:
+        if (last_day + timedelta(days=1)).day != 1:
+            return None
+        last_month = last_day.strftime("%Y-%m")
+    return first_month, last_month
+
+
+def _sales_summary_from_rollup(db: Session, filters: Optional[RecordFilters]) -> Optional[dict]:
+    """Sales summary read from sales_monthly_rollup, or None if the filters need raw records"""
+    month_range = _rollup_month_range(filters, db.get_bind().dialect.name)
+    if month_range is None:
+        return None
+    first_month, last_month = month_range
+    
+    query = db.query(
+        SalesMonthlyRollup.month,
+        SalesMonthlyRollup.zone,
+        SalesMonthlyRollup.sold_by,
+        SalesMonthlyRollup.lead_source,
+        SalesMonthlyRollup.record_count,
+        SalesMonthlyRollup.priced_count,
+        SalesMonthlyRollup.revenue,
+        SalesMonthlyRollup.highest_price,
+        SalesMonthlyRollup.lowest_price
+    )
+    if filters and filters.zone:
+        query = query.filter(SalesMonthlyRollup.zone == filters.zone)
+    if filters and filters.sold_by:
+        query = query.filter(SalesMonthlyRollup.sold_by == filters.sold_by)
+    if first_month:
+        query = query.filter(SalesMonthlyRollup.month >= first_month)
+    if last_month:
+        query = query.filter(SalesMonthlyRollup.month <= last_month)
+    
+    total_records = priced_count = 0
+    revenue_sum = 0
+    highest = lowest = None
+    breakdowns = {"zone": ({}, {}), "sold_by": ({}, {}), "lead_source": ({}, {})}
+    monthly = {}
+    
+    for month, zone, sold_by, lead_source, count, priced, revenue, high, low in query:
+        total_records += count
+        priced_count += priced
+        if revenue:
+            revenue_sum += revenue
+        if high is not None:
+            highest = high if highest is None else max(highest, high)
+        if low is not None:
+            lowest = low if lowest is None else min(lowest, low)
+        
+        for name, value in (("zone", zone), ("sold_by", sold_by), ("lead_source", lead_source)):
+            counts, revenues = breakdowns[name]
+            key = value or "Unknown"
+            counts[key] = counts.get(key, 0) + count
+            if revenue:
+                revenues[key] = revenues.get(key, 0) + revenue
+        
+        month_totals = monthly.setdefault(month, [0, 0])
+        month_totals[0] += count
+        month_totals[1] += revenue or 0
+    
+    for counts, revenues in breakdowns.values():
+        for key in revenues:
+            revenues[key] = float(revenues[key])
     
-    # Apply filters if provided
-    if filters:
-        if filters.zone:
-            query = query.filter(Record.zone == filters.zone)
-        if filters.sold_by:
-            query = query.filter(Record.sold_by == filters.sold_by)
-        if filters.date_from:
-            query = query.filter(Record.date_of_delivery >= filters.date_from)
-        if filters.date_to:
-            query = query.filter(Record.date_of_delivery <= filters.date_to)
-    
-    records = query.all()
-    
-    total_records = len(records)
-    records_with_price = [r for r in records if r.sale_price]
-    total_revenue = sum(float(r.sale_price) for r in records_with_price)
-    avg_order_value = total_revenue / len(records_with_price) if records_with_price else 0
-    
-    # Breakdown by zone (count and revenue)
-    by_zone = {}
-    by_zone_revenue = {}
-    for record in records:
-        zone = record.zone or "Unknown"
-        by_zone[zone] = by_zone.get(zone, 0) + 1
-        if record.sale_price:
-            by_zone_revenue[zone] = by_zone_revenue.get(zone, 0) + float(record.sale_price)
-    
-    # Breakdown by sold_by (count and revenue)
-    by_sold_by = {}
-    by_sold_by_revenue = {}
-    for record in records:
-        sold_by = record.sold_by or "Unknown"
-        by_sold_by[sold_by] = by_sold_by.get(sold_by, 0) + 1
-        if record.sale_price:
-            by_sold_by_revenue[sold_by] = by_sold_by_revenue.get(sold_by, 0) + float(record.sale_price)
-    
-    # Breakdown by lead_source (count and revenue)
-    by_lead_source = {}
-    by_lead_source_revenue = {}
-    for record in records:
-        lead_source = record.lead_source or "Unknown"
-        by_lead_source[lead_source] = by_lead_source.get(lead_source, 0) + 1
-        if record.sale_price:
-            by_lead_source_revenue[lead_source] = by_lead_source_revenue.get(lead_source, 0) + float(record.sale_price)
-    
-    # Monthly sales trends (last 12 months)
-    monthly_sales = defaultdict(lambda: {"count": 0, "revenue": 0})
-    
-    for record in records:
-        if record.date_of_delivery:
-            month_key = record.date_of_delivery.strftime("%Y-%m")
-            monthly_sales[month_key]["count"] += 1
-            if record.sale_price:
-                monthly_sales[month_key]["revenue"] += float(record.sale_price)
-    
-    # Sort monthly sales and get last 12 months
-    sorted_months = sorted(monthly_sales.keys())[-12:]
     monthly_trends = [
-        {
-            "month": month,
-            "count": monthly_sales[month]["count"],
-            "revenue": monthly_sales[month]["revenue"]
-        }
-        for month in sorted_months
+        {"month": month, "count": monthly[month][0], "revenue": float(monthly[month][1])}
+        for month in sorted(monthly)[-12:]
     ]
     
-    # Calculate projected sales for next 3 months based on average
+    return _sales_summary_payload(
+        total_records, priced_count, revenue_sum, highest, lowest, breakdowns, monthly_trends
+    )
+
+
+def _group_breakdown(db: Session, column, filters: Optional[RecordFilters]) -> tuple[dict, dict]:
+    """Count and revenue per value of column, with NULL reported as 'Unknown'"""
+    query = db.query(
+        column,
+        func.count(Record.id),
+        func.sum(_priced_revenue())
+    )
+    if filters:
+        query = _apply_filters(query, filters)
+    
+    counts = {}
+    revenue = {}
+    for value, count, total in query.group_by(column).all():
+        key = value or "Unknown"
+        counts[key] = counts.get(key, 0) + count
+        if total:
+            revenue[key] = revenue.get(key, 0) + float(total)
+    return counts, revenue
+
+
+def _project_sales(monthly_trends: list[dict]) -> list[dict]:
+    """Project sales for the next 3 months from the average of the last 3 months"""
     projected_sales = []
-    if monthly_trends and len(monthly_trends) >= 3:
-        # Use average of last 3 months for projection
-        recent_months = monthly_trends[-3:]
-        avg_monthly_count = sum(m["count"] for m in recent_months) / len(recent_months)
-        avg_monthly_revenue = sum(m["revenue"] for m in recent_months) / len(recent_months)
-        
-        # Calculate growth trend if we have enough data
-        if len(monthly_trends) >= 6:
-            recent_avg = sum(m["count"] for m in monthly_trends[-3:]) / 3
-            older_avg = sum(m["count"] for m in monthly_trends[-6:-3]) / 3
-            growth_rate = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
+    if len(monthly_trends) < 3:
+        return projected_sales
+    
+    # Use average of last 3 months for projection
+    recent_months = monthly_trends[-3:]
+    avg_monthly_count = sum(m["count"] for m in recent_months) / len(recent_months)
+    avg_monthly_revenue = sum(m["revenue"] for m in recent_months) / len(recent_months)
+    
+    # Calculate growth trend if we have enough data
+    if len(monthly_trends) >= 6:
+        recent_avg = sum(m["count"] for m in monthly_trends[-3:]) / 3
+        older_avg = sum(m["count"] for m in monthly_trends[-6:-3]) / 3
+        growth_rate = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
+    else:
+        growth_rate = 0
+    
+    # Project next 3 months
+    year, month_num = monthly_trends[-1]["month"].split('-')
+    current_month = date(int(year), int(month_num), 1)
+    for i in range(1, 4):
+        # Calculate next month
+        if current_month.month == 12:
+            next_month = date(current_month.year + 1, 1, 1)
         else:
-            growth_rate = 0
+            next_month = date(current_month.year, current_month.month + 1, 1)
+        
+        projected_sales.append({
+            "month": next_month.strftime("%Y-%m"),
+            "count": int(avg_monthly_count * (1 + growth_rate) ** i),
+            "revenue": avg_monthly_revenue * (1 + growth_rate) ** i
+        })
         
-        # Project next 3 months
-        if sorted_months:
-            last_month_str = sorted_months[-1]
-            year, month_num = last_month_str.split('-')
-            last_month = date(int(year), int(month_num), 1)
-            
-            current_month = last_month
-            for i in range(1, 4):
-                # Calculate next month
-                if current_month.month == 12:
-                    next_month = date(current_month.year + 1, 1, 1)
-                else:
-                    next_month = date(current_month.year, current_month.month + 1, 1)
-                
-                month_key = next_month.strftime("%Y-%m")
-                
-                projected_count = avg_monthly_count * (1 + growth_rate) ** i
-                projected_revenue = avg_monthly_revenue * (1 + growth_rate) ** i
-                
-                projected_sales.append({
-                    "month": month_key,
-                    "count": int(projected_count),
-                    "revenue": projected_revenue
-                })
-                
-                # Update for next iteration
-                current_month = next_month
+        # Update for next iteration
+        current_month = next_month
+    
+    return projected_sales
+
+
+def _sales_summary_payload(
+    total_records: int,
+    priced_count: int,
+    revenue_sum,
+    highest,
+    lowest,
+    breakdowns: dict[str, tuple[dict, dict]],
+    monthly_trends: list[dict]
+) -> dict:
+    """Assemble the SalesSummary payload from aggregated figures"""
+    total_revenue = float(revenue_sum) if revenue_sum else 0
+    avg_order_value = total_revenue / priced_count if priced_count else 0
     
     # Order details breakdown
     order_details = {
         "total_orders": total_records,
-        "orders_with_price": len(records_with_price),
-        "orders_without_price": total_records - len(records_with_price),
+        "orders_with_price": priced_count,
+        "orders_without_price": total_records - priced_count,
         "average_order_value": avg_order_value,
-        "highest_order": max((float(r.sale_price) for r in records_with_price), default=0),
-        "lowest_order": min((float(r.sale_price) for r in records_with_price), default=0) if records_with_price else 0
+        "highest_order": float(highest) if highest is not None else 0,
+        "lowest_order": float(lowest) if lowest is not None else 0
     }
     
+    by_zone, by_zone_revenue = breakdowns["zone"]
+    by_sold_by, by_sold_by_revenue = breakdowns["sold_by"]
+    by_lead_source, by_lead_source_revenue = breakdowns["lead_source"]
+    
     return {
         "total_records": total_records,
         "total_revenue": total_revenue if total_revenue > 0 else None,
@@ -348,6 +954,111 @@ def get_sales_summary(db: Session, filters: Optional[RecordFilters] = None) -> d
         "by_lead_source": by_lead_source,
         "by_lead_source_revenue": by_lead_source_revenue,
         "monthly_trends": monthly_trends,
-        "projected_sales": projected_sales,
+        # Calculate projected sales for next 3 months based on average
+        "projected_sales": _project_sales(monthly_trends),
         "order_details": order_details
     }
+
+
+def _sales_summary_from_records(db: Session, filters: Optional[RecordFilters]) -> dict:
+    """Sales summary aggregated from records with GROUP BY queries (no Record instances loaded)"""
+    # Totals and order details in a single aggregate query
+    totals_query = db.query(
+        func.count(Record.id),
+        func.count(_priced_revenue()),
+        func.sum(_priced_revenue()),
+        func.max(_priced_revenue()),
+        func.min(_priced_revenue())
+    )
+    if filters:
+        totals_query = _apply_filters(totals_query, filters)
+    total_records, priced_count, revenue_sum, highest, lowest = totals_query.one()
+    
+    # Breakdowns by zone, sold_by and lead_source (count and revenue)
+    breakdowns = {
+        "zone": _group_breakdown(db, Record.zone, filters),
+        "sold_by": _group_breakdown(db, Record.sold_by, filters),
+        "lead_source": _group_breakdown(db, Record.lead_source, filters)
+    }
+    
+    # Monthly sales trends (last 12 months with data)
+    month = month_key(db, Record.date_of_delivery)
+    monthly_query = db.query(
+        month,
+        func.count(Record.id),
+        func.sum(_priced_revenue())
+    ).filter(Record.date_of_delivery.isnot(None))
+    if filters:
+        monthly_query = _apply_filters(monthly_query, filters)
+    monthly_rows = monthly_query.group_by(month).order_by(desc(month)).limit(12).all()
+    monthly_trends = [
+        {
+            "month": month_str,
+            "count": count,
+            "revenue": float(revenue) if revenue else 0
+        }
+        for month_str, count, revenue in reversed(monthly_rows)
+    ]
+    
+    return _sales_summary_payload(
+        total_records, priced_count, revenue_sum, highest, lowest, breakdowns, monthly_trends
+    )
+
+
+def _sales_summary_from_snapshot(db: Session, filters: Optional[RecordFilters]) -> Optional[dict]:
+    """Sales summary computed from the in-memory columnar snapshot, or None for text searches"""
+    if filters and filters.search and filters.search.strip():
+        return None
+    
+    # Every record write bumps the shared version; max age bounds staleness from writes outside app.crud
+    version = get_data_version(db, "records")
+    if (
+        sales_snapshot.version != version
+        or time.monotonic() - sales_snapshot.refreshed_at > settings.sales_snapshot_max_age
+    ):
+        sales_snapshot.refresh(db, version)
+    
+    aggregates = sales_snapshot.summarize(filters, db.get_bind().dialect.name)
+    monthly_trends = [
+        {"month": f"{month // 12:04d}-{month % 12 + 1:02d}", "count": count, "revenue": revenue}
+        for month, count, revenue in aggregates["monthly"]
+    ]
+    return _sales_summary_payload(
+        aggregates["total_records"],
+        aggregates["priced_count"],
+        aggregates["revenue"],
+        aggregates["highest"],
+        aggregates["lowest"],
+        aggregates["breakdowns"],
+        monthly_trends
+    )
+
+
+def get_sales_summary(db: Session, filters: Optional[RecordFilters] = None) -> dict:
+    """Get sales summary with totals, breakdowns, trends, and projections.
+    
+    Repeat requests are answered from sales_summary_cache until a record is
+    written. Otherwise computed from the in-memory columnar snapshot when
+    enabled, from the few hundred rows of sales_monthly_rollup when the
+    filters cover whole months, or aggregated from records in SQL.
+    """
+    cache_key = None
+    if settings.response_cache_enabled:
+        cache_key = sales_summary_cache.key(
+            filters.model_dump(exclude_none=True) if filters else {}, get_data_version(db, "records")
+        )
+        summary = sales_summary_cache.get(cache_key)
+        if summary is not None:
+            return summary
+    
+    summary = None
+    if settings.use_sales_snapshot:
+        summary = _sales_summary_from_snapshot(db, filters)
+    if summary is None and settings.use_sales_rollup:
+        summary = _sales_summary_from_rollup(db, filters)
+    if summary is None:
+        summary = _sales_summary_from_records(db, filters)
+    
+    if settings.response_cache_enabled:
+        sales_summary_cache.set(cache_key, summary)
+    return summary
@@ -0,0 +1,47 @@
+"""
+Async versions of the app.crud functions.
+
+With USE_ASYNC_DB the session is an AsyncSession and each call runs the
+matching sync CRUD function through AsyncSession.run_sync, so database I/O is
+awaited on the event loop instead of holding a threadpool slot. With a plain
+Session the call is sent to the threadpool, as the sync routes did. Either
+way the CRUD logic (hooks, rollups, caches) lives only in app.crud.
+"""
+import functools
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud
+from app.database import AnySession
+
+
+async def run_db(db: AnySession, fn, *args, **kwargs):
+    """Run fn(session, *args, **kwargs) without blocking the event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def _async_version(fn):
+    @functools.wraps(fn)
+    async def wrapper(db: AnySession, *args, **kwargs):
+        return await run_db(db, fn, *args, **kwargs)
+    return wrapper
+
+
+create_record = _async_version(crud.create_record)
+get_record = _async_version(crud.get_record)
+get_record_by_record_id = _async_version(crud.get_record_by_record_id)
+update_record = _async_version(crud.update_record)
+delete_record = _async_version(crud.delete_record)
+get_records = _async_version(crud.get_records)
+get_records_after = _async_version(crud.get_records_after)
+get_records_by_client_phone = _async_version(crud.get_records_by_client_phone)
+get_client_summary = _async_version(crud.get_client_summary)
+get_filter_options = _async_version(crud.get_filter_options)
+get_records_validator = _async_version(crud.get_records_validator)
+get_data_version = _async_version(crud.get_data_version)
+get_record_changes = _async_version(crud.get_record_changes)
+get_records_out_of_warranty = _async_version(crud.get_records_out_of_warranty)
+get_records_expiring_soon = _async_version(crud.get_records_expiring_soon)
+get_warranty_summary = _async_version(crud.get_warranty_summary)
+get_sales_summary = _async_version(crud.get_sales_summary)
@@ -1,14 +1,121 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from typing import Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.config import settings
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    """create_engine keyword arguments for a database URL, from Settings"""
+    if is_sqlite(url):
+        options = {"connect_args": {"check_same_thread": False}}
+        if _is_memory_sqlite(url):
+            return options
+    else:
+        options = {}
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def sqlite_pragmas(url: str) -> dict[str, str]:
+    """PRAGMA settings applied to each new SQLite connection"""
+    pragmas = {
+        "busy_timeout": str(settings.sqlite_busy_timeout_ms),
+        "cache_size": str(-settings.sqlite_cache_size_kb),  # negative means KiB
+        "mmap_size": str(settings.sqlite_mmap_size),
+    }
+    if not _is_memory_sqlite(url):
+        pragmas["journal_mode"] = settings.sqlite_journal_mode
+        pragmas["synchronous"] = settings.sqlite_synchronous
+    return pragmas
+
+
+def _install_sqlite_pragmas(sync_engine: Engine) -> None:
+    pragmas = sqlite_pragmas(str(sync_engine.url))
+
+    @event.listens_for(sync_engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+if is_sqlite(settings.database_url):
+    _install_sqlite_pragmas(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Either kind of session handed to routes by get_session
+AnySession = Union[Session, AsyncSession]
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver (aiosqlite / asyncpg)"""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("sqlite", "sqlite+pysqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.use_async_db:
+    async_url = async_database_url(settings.database_url)
+    async_options = engine_options(settings.database_url)
+    async_options.pop("connect_args", None)
+    async_engine = create_async_engine(async_url, **async_options)
+    if is_sqlite(settings.database_url):
+        _install_sqlite_pragmas(async_engine.sync_engine)
+    # Objects stay loaded after commit so routes can serialize them outside the session's greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def describe_database_settings() -> dict:
+    """Active engine, pool and SQLite settings, for the startup report"""
+    report = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "async": settings.use_async_db,
+        "pool": type(engine.pool).__name__,
+    }
+    if isinstance(engine.pool, QueuePool):
+        report.update(
+            pool_size=engine.pool.size(),
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    if is_sqlite(settings.database_url):
+        # Read back what SQLite actually applied (e.g. journal_mode can be refused)
+        with engine.connect() as conn:
+            report["sqlite"] = {
+                name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in sqlite_pragmas(settings.database_url)
+            }
+    return report
+
 
 class Base(DeclarativeBase):
     pass
@@ -21,3 +128,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency for the session type selected by USE_ASYNC_DB; pair with app.crud_async
+get_session = get_async_db if settings.use_async_db else get_db
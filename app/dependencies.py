@@ -1,7 +1,24 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.security import verify_token
 from app.config import settings
+from app.database import get_session, AnySession
+from app.crud_async import get_records_validator, get_data_version
+from app.utils.cache import etag_matches
+
+# Records written this recently get no ETag: updated_at has one-second resolution on
+# SQLite, and a write in the same second would not change max(updated_at) again
+VALIDATOR_SETTLE_TIME = timedelta(seconds=2)
+
+# Last validator inputs, reused for validator_cache_ttl while no record is written
+_validator_cache = {"version": None, "expires_at": 0.0, "value": None}
+_validator_lock = threading.Lock()
 
 security = HTTPBearer()
 
@@ -48,3 +65,60 @@ def require_sales(role: str = Depends(get_current_role)) -> str:
 def require_any_role(role: str = Depends(get_current_role)) -> str:
     """Allow either maintenance or sales role"""
     return role
+
+
+def require_metrics_access(credentials: HTTPAuthorizationCredentials = Depends(security)) -> None:
+    """Allow the METRICS_TOKEN bearer token (for scrapers) or either role's login token"""
+    if settings.metrics_token and hmac.compare_digest(credentials.credentials, settings.metrics_token):
+        return
+    get_current_role(credentials)
+
+
+async def _records_validator(db: AnySession) -> tuple[int, object, datetime]:
+    """(count, max(updated_at), database now), cached briefly so polling bursts share one query"""
+    version = await get_data_version(db, "records")
+    now = time.monotonic()
+    with _validator_lock:
+        if _validator_cache["version"] == version and _validator_cache["expires_at"] > now:
+            return _validator_cache["value"]
+    
+    value = await get_records_validator(db)
+    with _validator_lock:
+        _validator_cache.update(version=version, expires_at=now + settings.validator_cache_ttl, value=value)
+    return value
+
+
+def conditional_get(role_dependency, daily: bool = False):
+    """
+    Dependency for read routes whose responses depend only on the records table.
+    Computes a weak ETag from the record count, max(updated_at), the route and
+    its query parameters (and today's UTC date if daily) and answers a matching
+    If-None-Match with 304 Not Modified before the route runs any query.
+    Returns the validator headers (also set on the response), or {} if none.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        role: str = Depends(role_dependency),
+        db: AnySession = Depends(get_session)
+    ) -> dict[str, str]:
+        count, last_updated, now = await _records_validator(db)
+        if last_updated is not None and last_updated >= now - VALIDATOR_SETTLE_TIME:
+            return {}
+        
+        payload = [
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            count,
+            last_updated.isoformat() if last_updated else None,
+            datetime.utcnow().date().isoformat() if daily else None,  # warranty status changes daily
+        ]
+        digest = hashlib.sha1(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+        headers = {"ETag": f'W/"{digest[:20]}"', "Cache-Control": "private, no-cache"}
+        
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+    
+    return dependency
@@ -1,16 +1,32 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, records, sales, export, filters
-from app.database import engine, Base
+from app.config import settings
+from app.routers import auth, records, sales, export, filters, metrics
+from app.database import engine, async_engine, Base, SessionLocal, describe_database_settings
 from app.models import Record  # Import models to register with Base
+from app.crud import ensure_sales_rollup
+from app.utils.metrics import MetricsMiddleware, instrument_engine, instrument_orm
+from app.utils.compression import CompressionMiddleware
+from app.utils.serialization import FastJSONResponse
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Populate the sales rollup if its table was just created
+with SessionLocal() as db:
+    ensure_sales_rollup(db)
+
+# Startup report of the active database settings (uvicorn's logger is configured to show INFO)
+logger = logging.getLogger("uvicorn.error")
+for name, value in describe_database_settings().items():
+    logger.info("database %s: %s", name, value)
+
 app = FastAPI(
     title="Maintenance CRM + Sales Report CRM",
     description="FastAPI backend for Maintenance CRM and Sales Report CRM with two-passcode authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -30,14 +46,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Compress JSON and CSV responses (CSV exports are compressed as they stream)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        brotli_enabled=settings.compression_brotli
+    )
+
+# Request instrumentation; added last so it is the outermost middleware and times everything
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    instrument_orm()
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(records.router)
 app.include_router(sales.router)
 app.include_router(export.router)
 app.include_router(filters.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -36,6 +36,8 @@ class Record(Base):
     # Client
     client_name: Mapped[str] = mapped_column(String(200), nullable=False)
     client_phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # Digits of client_phone in national form (app.utils.phone), set by the crud write paths
+    client_phone_normalized: Mapped[str | None] = mapped_column(String(20), nullable=True)
     client_address: Mapped[str | None] = mapped_column(Text, nullable=True)
     zone: Mapped[str | None] = mapped_column(String(100), nullable=True)
     
@@ -47,12 +49,13 @@ class Record(Base):
     # Other
     remarks: Mapped[str | None] = mapped_column(Text, nullable=True)
     
-    # Indexes
+    # Indexes (the composites serve filtered listings and client history in date_of_delivery order)
     __table_args__ = (
-        Index('idx_client_phone', 'client_phone'),
-        Index('idx_zone', 'zone'),
+        Index('idx_client_phone_normalized_date_of_delivery', 'client_phone_normalized', 'date_of_delivery'),
+        Index('idx_zone_date_of_delivery_id', 'zone', 'date_of_delivery', 'id'),
         Index('idx_date_of_delivery', 'date_of_delivery'),
-        Index('idx_sold_by', 'sold_by'),
+        Index('idx_updated_at', 'updated_at'),  # conditional GET validators and delta sync
+        Index('idx_sold_by_date_of_delivery_id', 'sold_by', 'date_of_delivery', 'id'),
         Index('idx_lead_source', 'lead_source'),
         Index('idx_capacity_kw', 'capacity_kw'),
         Index('idx_heater', 'heater'),
@@ -60,3 +63,63 @@ class Record(Base):
         Index('idx_card', 'card'),
         Index('idx_body', 'body'),
     )
+
+
+class RecordIdCounter(Base):
+    """Next unreserved number for generated record IDs (see app.utils.id_allocator)"""
+    __tablename__ = "record_id_counters"
+    
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    next_value: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class DataVersion(Base):
+    """Version of a kind of data, bumped in the transaction of every write to it.
+    
+    Read by caches in every worker process (sales summary responses, the sales
+    snapshot, ETag validators, export jobs) to notice writes made anywhere.
+    """
+    __tablename__ = "data_versions"
+    
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SalesMonthlyRollup(Base):
+    """Sales counts and revenue per month x zone x sold_by x lead_source.
+    
+    Maintained by the record write paths in app.crud; NULL dimensions are
+    stored as "" so every bucket has a unique primary key.
+    """
+    __tablename__ = "sales_monthly_rollup"
+    
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)  # YYYY-MM of date_of_delivery
+    zone: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sold_by: Mapped[str] = mapped_column(String(200), primary_key=True)
+    lead_source: Mapped[str] = mapped_column(String(200), primary_key=True)
+    
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    priced_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    revenue: Mapped[float | None] = mapped_column(Numeric(14, 2), nullable=True)
+    highest_price: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
+    lowest_price: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
+
+
+class RecordTombstone(Base):
+    """A deleted record, kept so delta sync clients (GET /records/changes) can drop it.
+    
+    Written by app.crud.delete_record and pruned after sync_tombstone_retention_days.
+    AUTOINCREMENT on SQLite so ids are never reused once old tombstones are pruned
+    (sync cursors resume after the last tombstone id they saw).
+    """
+    __tablename__ = "record_tombstones"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    record_pk: Mapped[int] = mapped_column(Integer, nullable=False)  # records.id of the deleted row
+    record_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_record_tombstones_deleted_at', 'deleted_at'),
+        {'sqlite_autoincrement': True},
+    )
@@ -1,17 +1,51 @@
-from fastapi import APIRouter, Depends, Query, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_session, AnySession, SessionLocal
 from app.dependencies import require_maintenance, require_sales, require_any_role
-from app.schemas import RecordFilters
-from app.crud import get_records, get_sales_summary
-from app.utils.export_utils import export_to_csv, export_to_xlsx, export_to_pdf
+from app.schemas import RecordFilters, ExportJobRequest, ExportJobResponse
+from app.crud import iter_record_rows, get_data_version
+from app.crud_async import run_db
+from app.utils.export_utils import export_columns, iter_csv, write_xlsx, iter_file
+from app.utils.export_jobs import EXPORT_KINDS, EXPORT_MEDIA_TYPES, export_jobs, job_timestamp
 
 router = APIRouter(prefix="/export", tags=["export"])
 
 
+def stream_export_rows(filters: RecordFilters):
+    """Yield export rows using a session owned by the generator.
+    
+    The request-scoped session is closed before a StreamingResponse body is
+    sent, so streamed exports open and close their own.
+    """
+    db = SessionLocal()
+    try:
+        yield from iter_record_rows(db, filters, export_columns())
+    finally:
+        db.close()
+
+
+async def export_pdf(db: AnySession, kind: str, filters: RecordFilters) -> FileResponse:
+    """
+    Render all matching records as a PDF on the export job workers and send it.
+    The request waits without holding a threadpool thread, concurrent renders
+    are bounded by export_job_workers, and identical requests share one job.
+    """
+    version = await run_db(db, get_data_version, "records")
+    job = await run_in_threadpool(export_jobs.submit, kind, "pdf", filters, version)
+    job = await export_jobs.wait(job["id"])
+    if job is None or job["status"] != "done":
+        raise HTTPException(status_code=500, detail="PDF export failed")
+    return FileResponse(
+        export_jobs.artifact_path(job),
+        media_type=EXPORT_MEDIA_TYPES["pdf"],
+        filename=f"{kind}.pdf"
+    )
+
+
 @router.get("/records.csv")
 def export_records_csv(
     search: Optional[str] = None,
@@ -25,7 +59,6 @@ def export_records_csv(
     lead_source: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
     role: str = Depends(require_maintenance)
 ):
     """Export records to CSV (maintenance only)"""
@@ -43,13 +76,9 @@ def export_records_csv(
         date_to=date_to
     )
     
-    # Get all matching records (no pagination for export)
-    records, _ = get_records(db, filters, page=1, page_size=10000)
-    
-    csv_file = export_to_csv(records)
-    
+    # Stream all matching records (no pagination for export)
     return StreamingResponse(
-        csv_file,
+        iter_csv(stream_export_rows(filters)),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=records.csv"}
     )
@@ -86,19 +115,17 @@ def export_records_xlsx(
         date_to=date_to
     )
     
-    records, _ = get_records(db, filters, page=1, page_size=10000)
-    
-    xlsx_file = export_to_xlsx(records)
+    xlsx_file = write_xlsx(iter_record_rows(db, filters, export_columns()))
     
     return StreamingResponse(
-        xlsx_file,
+        iter_file(xlsx_file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=records.xlsx"}
     )
 
 
 @router.get("/records.pdf")
-def export_records_pdf(
+async def export_records_pdf(
     search: Optional[str] = None,
     zone: Optional[str] = None,
     capacity_kw: Optional[str] = None,
@@ -110,7 +137,7 @@ def export_records_pdf(
     lead_source: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Export records to PDF (maintenance only)"""
@@ -128,15 +155,8 @@ def export_records_pdf(
         date_to=date_to
     )
     
-    records, _ = get_records(db, filters, page=1, page_size=10000)
-    
-    pdf_file = export_to_pdf(records, "Records Export")
-    
-    return StreamingResponse(
-        pdf_file,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=records.pdf"}
-    )
+    # All matching records; large exports are rendered in chunks by worker processes
+    return await export_pdf(db, "records", filters)
 
 
 @router.get("/sales.csv")
@@ -145,7 +165,6 @@ def export_sales_csv(
     sold_by: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
     role: str = Depends(require_sales)
 ):
     """Export sales records to CSV (sales only)"""
@@ -156,12 +175,8 @@ def export_sales_csv(
         date_to=date_to
     )
     
-    records, _ = get_records(db, filters, page=1, page_size=10000)
-    
-    csv_file = export_to_csv(records)
-    
     return StreamingResponse(
-        csv_file,
+        iter_csv(stream_export_rows(filters)),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=sales.csv"}
     )
@@ -184,24 +199,22 @@ def export_sales_xlsx(
         date_to=date_to
     )
     
-    records, _ = get_records(db, filters, page=1, page_size=10000)
-    
-    xlsx_file = export_to_xlsx(records)
+    xlsx_file = write_xlsx(iter_record_rows(db, filters, export_columns()))
     
     return StreamingResponse(
-        xlsx_file,
+        iter_file(xlsx_file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=sales.xlsx"}
     )
 
 
 @router.get("/sales.pdf")
-def export_sales_pdf(
+async def export_sales_pdf(
     zone: Optional[str] = None,
     sold_by: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_sales)
 ):
     """Export sales records to PDF (sales only)"""
@@ -212,12 +225,72 @@ def export_sales_pdf(
         date_to=date_to
     )
     
-    records, _ = get_records(db, filters, page=1, page_size=10000)
+    # All matching records; large exports are rendered in chunks by worker processes
+    return await export_pdf(db, "sales", filters)
+
+
+def _job_response(job: dict) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=job["id"],
+        kind=job["kind"],
+        format=job["format"],
+        status=job["status"],
+        created_at=job_timestamp(job["created_at"]),
+        finished_at=job_timestamp(job["finished_at"]),
+        expires_at=job_timestamp(job["expires_at"]),
+        size=job["size"],
+        error=job["error"],
+        download_url=f"/export/jobs/{job['id']}/download" if job["status"] == "done" else None
+    )
+
+
+def _get_job_for_role(job_id: str, role: str) -> dict:
+    job = export_jobs.get(job_id)
+    if job is None or EXPORT_KINDS[job["kind"]][0] != role:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.post("/jobs", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    job_request: ExportJobRequest,
+    db: Session = Depends(get_db),
+    role: str = Depends(require_any_role)
+):
+    """Queue a background export; identical pending or finished requests return the existing job"""
+    required_role, _ = EXPORT_KINDS[job_request.kind]
+    if role != required_role:
+        raise HTTPException(status_code=403, detail=f"{required_role.capitalize()} role required")
     
-    pdf_file = export_to_pdf(records, "Sales Records Export")
+    filters = job_request.filters
+    if job_request.kind == "sales":
+        # Same filters as the /export/sales.* endpoints
+        filters = RecordFilters(
+            zone=filters.zone,
+            sold_by=filters.sold_by,
+            date_from=filters.date_from,
+            date_to=filters.date_to
+        )
     
-    return StreamingResponse(
-        pdf_file,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=sales.pdf"}
+    version = get_data_version(db, "records")
+    return _job_response(export_jobs.submit(job_request.kind, job_request.format, filters, version))
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+def get_export_job(job_id: str, role: str = Depends(require_any_role)):
+    """Get the status of an export job"""
+    return _job_response(_get_job_for_role(job_id, role))
+
+
+@router.get("/jobs/{job_id}/download")
+def download_export_job(job_id: str, role: str = Depends(require_any_role)):
+    """Download the file produced by a finished export job"""
+    job = _get_job_for_role(job_id, role)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    
+    return FileResponse(
+        export_jobs.artifact_path(job),
+        media_type=EXPORT_MEDIA_TYPES[job["format"]],
+        filename=f"{job['kind']}.{job['format']}"
     )
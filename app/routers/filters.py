@@ -1,37 +1,58 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import distinct, func
-from app.database import get_db
+import hashlib
+import json
+import threading
+import time
+from fastapi import APIRouter, Depends, Header, Response
+from typing import Optional
+from app.config import settings
+from app.database import get_session, AnySession
 from app.dependencies import require_any_role
-from app.models import Record
+from app.crud_async import get_filter_options, get_data_version
+from app.utils.cache import etag_matches
 
 router = APIRouter(prefix="/filters", tags=["filters"])
 
+# Last computed options, valid while the shared filter_options data version is unchanged
+_options_cache = {"version": None, "expires_at": 0.0, "options": None, "etag": None}
+_options_lock = threading.Lock()
+
+
+async def _cached_filter_options(db: AnySession) -> tuple[dict, str]:
+    """Return (options, etag), recomputing only after a relevant write or TTL expiry"""
+    version = await get_data_version(db, "filter_options")
+    now = time.monotonic()
+    with _options_lock:
+        if _options_cache["version"] == version and _options_cache["expires_at"] > now:
+            return _options_cache["options"], _options_cache["etag"]
+    
+    options = await get_filter_options(db)
+    digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()
+    etag = f'"{digest[:20]}"'
+    
+    with _options_lock:
+        _options_cache.update(
+            version=version,
+            expires_at=now + settings.filter_options_cache_ttl,
+            options=options,
+            etag=etag
+        )
+    return options, etag
+
 
 @router.get("/options")
-def get_filter_options(
-    db: Session = Depends(get_db),
+async def get_filter_options_endpoint(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_any_role)
 ):
     """Get all available filter options from the database"""
+    options, etag = await _cached_filter_options(db)
     
-    # Get distinct values for each filter field
-    zones = [row[0] for row in db.query(distinct(Record.zone)).filter(Record.zone.isnot(None)).order_by(Record.zone).all()]
-    capacity_kw = [row[0] for row in db.query(distinct(Record.capacity_kw)).filter(Record.capacity_kw.isnot(None)).order_by(Record.capacity_kw).all()]
-    heaters = [row[0] for row in db.query(distinct(Record.heater)).filter(Record.heater.isnot(None)).order_by(Record.heater).all()]
-    controllers = [row[0] for row in db.query(distinct(Record.controller)).filter(Record.controller.isnot(None)).order_by(Record.controller).all()]
-    cards = [row[0] for row in db.query(distinct(Record.card)).filter(Record.card.isnot(None)).order_by(Record.card).all()]
-    bodies = [row[0] for row in db.query(distinct(Record.body)).filter(Record.body.isnot(None)).order_by(Record.body).all()]
-    sold_by = [row[0] for row in db.query(distinct(Record.sold_by)).filter(Record.sold_by.isnot(None)).order_by(Record.sold_by).all()]
-    lead_sources = [row[0] for row in db.query(distinct(Record.lead_source)).filter(Record.lead_source.isnot(None)).order_by(Record.lead_source).all()]
+    # The ETag is a hash of the content, so it is stable across worker processes
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    return {
-        "zones": zones,
-        "capacity_kw": capacity_kw,
-        "heaters": heaters,
-        "controllers": controllers,
-        "cards": cards,
-        "bodies": bodies,
-        "sold_by": sold_by,
-        "lead_sources": lead_sources
-    }
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return options
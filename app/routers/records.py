@@ -1,75 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
-from app.database import get_db
-from app.dependencies import require_maintenance
+from app.database import get_db, get_session, AnySession
+from app.dependencies import require_maintenance, conditional_get
 from app.schemas import (
     RecordCreate, RecordUpdate, RecordResponse, RecordListResponse,
-    RecordFilters, RecordWithWarranty, WarrantySummary
+    RecordFilters, RecordWithWarranty, WarrantySummary, ImportResult, RecordChangesResponse, ClientSummary
 )
-from app.crud import (
+from app.crud_async import (
     create_record, get_record, update_record, delete_record,
-    get_records, get_records_out_of_warranty, get_records_expiring_soon,
-    get_warranty_summary, get_records_by_client_phone
+    get_records, get_records_after, get_records_out_of_warranty, get_records_expiring_soon,
+    get_warranty_summary, get_records_by_client_phone, get_client_summary, get_record_changes
 )
 from app.utils.warranty import get_warranty_status
+from app.utils.pagination import CursorExpired, cursor_for
+from app.utils.serialization import serializer_for, render_record_list, render_record_changes
+from app.utils.import_utils import IMPORT_FORMATS, detect_format, import_records
 
 router = APIRouter(prefix="/records", tags=["records"])
 
+# 304 Not Modified for repeat polls while records are unchanged
+records_unchanged = conditional_get(require_maintenance)
+warranty_unchanged = conditional_get(require_maintenance, daily=True)
+
 
 @router.post("", response_model=RecordResponse, status_code=201)
-def create_record_endpoint(
+async def create_record_endpoint(
     record: RecordCreate,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Create a new record (maintenance only)"""
-    return create_record(db, record)
+    return await create_record(db, record)
+
+
+@router.post("/import", response_model=ImportResult)
+def import_records_endpoint(
+    file: UploadFile = File(..., description="CSV, XLSX or JSON Lines file"),
+    format: Optional[str] = Query(None, description="csv, xlsx or jsonl; detected from the file name if omitted"),
+    batch_size: int = Query(500, ge=1, le=10000, description="Rows validated and inserted per transaction"),
+    keep_record_ids: bool = Query(False, description="Keep record_id values from the file instead of allocating new ones"),
+    db: Session = Depends(get_db),
+    role: str = Depends(require_maintenance)
+):
+    """Bulk import records from a file, reporting per-row errors (maintenance only)"""
+    fmt = (format or detect_format(file.filename) or "").lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported import format; use csv, xlsx or jsonl")
+    
+    result = import_records(db, file.file, fmt, batch_size, keep_record_ids)
+    return ImportResult(**result)
+
+
+@router.get("/changes", response_model=RecordChangesResponse)
+async def get_record_changes_endpoint(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000, description="Records and deletions per batch"),
+    fields: Optional[str] = Query(None, description="Comma-separated record fields and/or presets (card, detail, export); default: all fields"),
+    db: AnySession = Depends(get_session),
+    role: str = Depends(require_maintenance)
+):
+    """
+    Delta sync: records created, updated or deleted since the cursor (maintenance only).
+    Repeat with next_cursor while has_more is true, then keep the last next_cursor
+    for the next sync. An expired cursor returns 410; sync again without one.
+    """
+    try:
+        serializer = serializer_for(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        rows, tombstones, next_cursor, has_more = await get_record_changes(db, serializer.columns, cursor, limit)
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Response(
+        content=render_record_changes(serializer, rows, tombstones, next_cursor, has_more),
+        media_type="application/json"
+    )
 
 
 @router.get("/{record_id}", response_model=RecordResponse)
-def get_record_endpoint(
+async def get_record_endpoint(
     record_id: int,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Get a record by ID (maintenance only)"""
-    record = get_record(db, record_id)
+    record = await get_record(db, record_id)
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
     return record
 
 
 @router.patch("/{record_id}", response_model=RecordResponse)
-def update_record_endpoint(
+async def update_record_endpoint(
     record_id: int,
     record_update: RecordUpdate,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Update a record (maintenance only)"""
-    record = update_record(db, record_id, record_update)
+    record = await update_record(db, record_id, record_update)
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
     return record
 
 
 @router.delete("/{record_id}", status_code=204)
-def delete_record_endpoint(
+async def delete_record_endpoint(
     record_id: int,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Delete a record (maintenance only)"""
-    success = delete_record(db, record_id)
+    success = await delete_record(db, record_id)
     if not success:
         raise HTTPException(status_code=404, detail="Record not found")
     return None
 
 
 @router.get("", response_model=RecordListResponse)
-def list_records(
+async def list_records(
     search: Optional[str] = Query(None, description="Search in record_id, name, phone, address"),
     zone: Optional[str] = None,
     capacity_kw: Optional[str] = None,
@@ -81,10 +136,14 @@ def list_records(
     lead_source: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
-    sort_by: str = Query("date_of_delivery"),
+    sort_by: str = Query("date_of_delivery", description="Column to sort by, or 'relevance' when searching"),
     sort_desc: bool = Query(True),
-    db: Session = Depends(get_db),
-    role: str = Depends(require_maintenance)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; pass an empty value to start cursor pagination"),
+    include_total: bool = Query(False, description="Also count matching records in cursor mode"),
+    fields: Optional[str] = Query(None, description="Comma-separated record fields and/or presets (card, detail, export); default: all fields"),
+    db: AnySession = Depends(get_session),
+    role: str = Depends(require_maintenance),
+    validator_headers: dict = Depends(records_unchanged)
 ):
     """List records with search, filters, and pagination (maintenance only)"""
     filters = RecordFilters(
@@ -99,25 +158,39 @@ def list_records(
         lead_source=lead_source
     )
     
-    records, total = get_records(db, filters, page, page_size, sort_by, sort_desc)
+    # Plain column rows serialized straight to JSON (RecordListResponse, or the requested fields of it)
+    try:
+        serializer = serializer_for(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = serializer.columns
+    if cursor is not None:
+        try:
+            rows, total, next_cursor = await get_records_after(
+                db, filters, cursor, page_size, sort_by, sort_desc, include_total, columns
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        rows, total = await get_records(db, filters, page, page_size, sort_by, sort_desc, columns)
+        next_cursor = cursor_for(rows, sort_by, sort_desc) if page * page_size < total else None
     
-    return RecordListResponse(
-        records=records,
-        total=total,
-        page=page,
-        page_size=page_size
+    return Response(
+        content=render_record_list(serializer, rows, total, page, page_size, next_cursor),
+        media_type="application/json",
+        headers=validator_headers  # returned Responses do not get the dependency's headers
     )
 
 
 @router.get("/warranty/out-of-warranty", response_model=RecordListResponse)
-def get_out_of_warranty(
+async def get_out_of_warranty(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Get records that are out of warranty (maintenance only)"""
-    records, total = get_records_out_of_warranty(db, page, page_size)
+    records, total = await get_records_out_of_warranty(db, page, page_size)
     
     return RecordListResponse(
         records=records,
@@ -128,15 +201,15 @@ def get_out_of_warranty(
 
 
 @router.get("/warranty/expiring-soon", response_model=RecordListResponse)
-def get_expiring_soon(
+async def get_expiring_soon(
     days: int = Query(30, ge=1, le=365, description="Days until expiry"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Get records expiring soon (maintenance only)"""
-    records, total = get_records_expiring_soon(db, days, page, page_size)
+    records, total = await get_records_expiring_soon(db, days, page, page_size)
     
     return RecordListResponse(
         records=records,
@@ -146,27 +219,28 @@ def get_expiring_soon(
     )
 
 
-@router.get("/warranty/summary", response_model=WarrantySummary)
-def get_warranty_summary_endpoint(
+@router.get("/warranty/summary", response_model=WarrantySummary, dependencies=[Depends(warranty_unchanged)])
+async def get_warranty_summary_endpoint(
     days: int = Query(30, ge=1, le=365, description="Days for expiring soon threshold"),
-    db: Session = Depends(get_db),
+    breakdown: Optional[str] = Query(None, pattern="^(zone|month)$", description="Also return counts per zone or per expiry month"),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
     """Get warranty summary counts (maintenance only)"""
-    summary = get_warranty_summary(db, days)
+    summary = await get_warranty_summary(db, days, breakdown)
     return WarrantySummary(**summary)
 
 
 @router.get("/history/{client_phone}", response_model=RecordListResponse)
-def get_client_history(
+async def get_client_history(
     client_phone: str,
     exclude_id: Optional[int] = Query(None, description="Record ID to exclude from results"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_maintenance)
 ):
-    """Get history of records for a specific client phone number (maintenance only)"""
-    records = get_records_by_client_phone(db, client_phone, exclude_id=exclude_id, limit=limit)
+    """Get history of records for a client phone number in any format (maintenance only)"""
+    records = await get_records_by_client_phone(db, client_phone, exclude_id=exclude_id, limit=limit)
     
     return RecordListResponse(
         records=records,
@@ -174,3 +248,16 @@ def get_client_history(
         page=1,
         page_size=len(records)
     )
+
+
+@router.get("/history/{client_phone}/summary", response_model=ClientSummary, dependencies=[Depends(records_unchanged)])
+async def get_client_summary_endpoint(
+    client_phone: str,
+    db: AnySession = Depends(get_session),
+    role: str = Depends(require_maintenance)
+):
+    """Order count, lifetime revenue and last order/service dates of a client (maintenance only)"""
+    summary = await get_client_summary(db, client_phone)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No records for this phone number")
+    return ClientSummary(**summary)
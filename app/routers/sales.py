@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import Optional
 from datetime import datetime
-from app.database import get_db
-from app.dependencies import require_sales
-from app.schemas import RecordListResponse, RecordFilters, SalesSummary
-from app.crud import get_records, get_sales_summary
+from app.database import get_session, AnySession
+from app.dependencies import require_sales, conditional_get
+from app.schemas import RecordListResponse, RecordFilters, SalesSummary, CacheStats
+from app.crud_async import get_records, get_records_after, get_sales_summary
+from app.utils.pagination import cursor_for
+from app.utils.serialization import serializer_for, render_record_list
+from app.utils.cache import sales_summary_cache
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
+# 304 Not Modified for repeat polls while records are unchanged
+records_unchanged = conditional_get(require_sales)
+
 
 @router.get("/records", response_model=RecordListResponse)
-def get_sales_records(
+async def get_sales_records(
     search: Optional[str] = Query(None, description="Search in record_id, name, phone, address"),
     zone: Optional[str] = None,
     capacity_kw: Optional[str] = None,
@@ -25,10 +30,14 @@ def get_sales_records(
     date_to: Optional[datetime] = Query(None, description="End date filter"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
-    sort_by: str = Query("date_of_delivery"),
+    sort_by: str = Query("date_of_delivery", description="Column to sort by, or 'relevance' when searching"),
     sort_desc: bool = Query(True),
-    db: Session = Depends(get_db),
-    role: str = Depends(require_sales)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; pass an empty value to start cursor pagination"),
+    include_total: bool = Query(False, description="Also count matching records in cursor mode"),
+    fields: Optional[str] = Query(None, description="Comma-separated record fields and/or presets (card, detail, export); default: all fields"),
+    db: AnySession = Depends(get_session),
+    role: str = Depends(require_sales),
+    validator_headers: dict = Depends(records_unchanged)
 ):
     """Get sales records with filters (read-only, sales role)"""
     filters = RecordFilters(
@@ -45,23 +54,37 @@ def get_sales_records(
         date_to=date_to
     )
     
-    records, total = get_records(db, filters, page, page_size, sort_by, sort_desc)
+    # Plain column rows serialized straight to JSON (RecordListResponse, or the requested fields of it)
+    try:
+        serializer = serializer_for(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = serializer.columns
+    if cursor is not None:
+        try:
+            rows, total, next_cursor = await get_records_after(
+                db, filters, cursor, page_size, sort_by, sort_desc, include_total, columns
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        rows, total = await get_records(db, filters, page, page_size, sort_by, sort_desc, columns)
+        next_cursor = cursor_for(rows, sort_by, sort_desc) if page * page_size < total else None
     
-    return RecordListResponse(
-        records=records,
-        total=total,
-        page=page,
-        page_size=page_size
+    return Response(
+        content=render_record_list(serializer, rows, total, page, page_size, next_cursor),
+        media_type="application/json",
+        headers=validator_headers  # returned Responses do not get the dependency's headers
     )
 
 
-@router.get("/summary", response_model=SalesSummary)
-def get_sales_summary_endpoint(
+@router.get("/summary", response_model=SalesSummary, dependencies=[Depends(records_unchanged)])
+async def get_sales_summary_endpoint(
     zone: Optional[str] = None,
     sold_by: Optional[str] = None,
     date_from: Optional[datetime] = Query(None, description="Start date filter"),
     date_to: Optional[datetime] = Query(None, description="End date filter"),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     role: str = Depends(require_sales)
 ):
     """Get sales summary with totals and breakdowns (sales role)"""
@@ -72,5 +95,11 @@ def get_sales_summary_endpoint(
         date_to=date_to
     )
     
-    summary = get_sales_summary(db, filters)
+    summary = await get_sales_summary(db, filters)
     return SalesSummary(**summary)
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def get_sales_cache_stats(role: str = Depends(require_sales)):
+    """Hit/miss counters of the sales summary cache (counted per worker process)"""
+    return sales_summary_cache.stats()
@@ -81,9 +81,48 @@ class RecordWithWarranty(RecordResponse):
 
 class RecordListResponse(BaseModel):
     records: list[RecordResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless include_total=true
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the following page
+
+
+class RecordTombstoneResponse(BaseModel):
+    id: int  # id of the deleted record
+    record_id: str
+    deleted_at: datetime
+
+
+class RecordChangesResponse(BaseModel):
+    records: list[RecordResponse]  # created or updated since the cursor; upsert by id
+    deleted: list[RecordTombstoneResponse]  # apply before records
+    next_cursor: str  # pass back as ?cursor= for the next batch or the next sync
+    has_more: bool  # true: call again now; false: caught up
+
+
+class ClientSummary(BaseModel):
+    client_phone: str  # normalized
+    client_name: str  # as on the client's latest record
+    order_count: int
+    priced_count: int
+    lifetime_revenue: float
+    average_order_value: Optional[float] = None
+    first_order: date
+    last_order: date
+    last_service: Optional[date] = None  # latest installation or site visit
+
+
+# Import schemas
+class ImportRowError(BaseModel):
+    row: int  # 1-based position of the data row in the uploaded file
+    errors: list[str]
+
+
+class ImportResult(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    errors: list[ImportRowError]
 
 
 # Filter/Pagination schemas
@@ -102,13 +141,18 @@ class RecordFilters(BaseModel):
 
 
 # Warranty schemas
-class WarrantySummary(BaseModel):
+class WarrantyCounts(BaseModel):
     in_warranty: int
     out_of_warranty: int
     expiring_soon: int
     total: int
 
 
+class WarrantySummary(WarrantyCounts):
+    by_zone: Optional[dict[str, WarrantyCounts]] = None
+    by_month: Optional[dict[str, WarrantyCounts]] = None  # keyed by warranty expiry month (YYYY-MM)
+
+
 # Sales schemas
 class MonthlyTrend(BaseModel):
     month: str
@@ -144,3 +188,35 @@ class SalesSummary(BaseModel):
     monthly_trends: list[MonthlyTrend]
     projected_sales: list[ProjectedSale]
     order_details: OrderDetails
+
+
+class CacheStats(BaseModel):
+    name: str
+    backend: str
+    hits: int
+    misses: int
+    errors: int
+    hit_rate: float
+    entries: Optional[int] = None  # not tracked by the redis backend
+    max_entries: Optional[int] = None
+    ttl: int
+
+
+# Export job schemas
+class ExportJobRequest(BaseModel):
+    kind: str = Field("records", pattern="^(records|sales)$")
+    format: str = Field(..., pattern="^(csv|xlsx|pdf)$")
+    filters: RecordFilters = RecordFilters()
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    kind: str
+    format: str
+    status: str  # queued, running, done or failed
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
+    size: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
@@ -0,0 +1,290 @@
+"""
+Columnar in-memory snapshot of the records table for sales analytics.
+
+The snapshot keeps one compact array per column needed by /sales/summary:
+delivery date ordinals, month indexes, sale price in cents (0 = unpriced) and
+dictionary-encoded codes for the filter and breakdown columns (0 = NULL/empty).
+Summaries for any combination of column and date filters are computed with
+vectorized group-bys (NumPy bincount) or, without NumPy, single passes over
+array module buffers. It is refreshed incrementally from updated_at; deletes
+are detected by a row count mismatch and trigger a full rebuild.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models import Record
+from app.schemas import RecordFilters
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python aggregation over array buffers
+    np = None
+
+# Dictionary-encoded columns: filterable, and the first three are summary breakdowns
+CODED_COLUMNS = ["zone", "sold_by", "lead_source", "capacity_kw", "heater", "controller", "card", "body"]
+BREAKDOWN_COLUMNS = ["zone", "sold_by", "lead_source"]
+
+# Rows changed this long before the last refresh are re-read, covering clock
+# differences between application-set and database-set updated_at values
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+_SELECT_COLUMNS = [Record.id, Record.updated_at, Record.date_of_delivery, Record.sale_price] + [
+    getattr(Record, column) for column in CODED_COLUMNS
+]
+
+
+def _cents(price) -> int:
+    if price is None:
+        return 0
+    if isinstance(price, Decimal):
+        return int(price * 100)
+    return int(round(price * 100))
+
+
+def delivery_date_bounds(filters: RecordFilters, dialect: str) -> tuple[Optional[date], Optional[date]]:
+    """
+    First and last delivery dates matched by the SQL date filters of
+    crud._apply_filters. SQLite compares 'YYYY-MM-DD' with the full timestamp
+    string (so date_from excludes its own day), other databases compare the
+    delivery date at midnight with the timestamp.
+    """
+    first = last = None
+    if filters.date_from:
+        first = filters.date_from.date()
+        if dialect == "sqlite" or filters.date_from.time() != datetime.min.time():
+            first += timedelta(days=1)
+    if filters.date_to:
+        last = filters.date_to.date()
+    return first, last
+
+
+def _month_index(ordinal: int) -> int:
+    day = date.fromordinal(ordinal)
+    return day.year * 12 + day.month - 1
+
+
+class SalesSnapshot:
+    """Columnar copy of the records columns used by the sales summary"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.refreshed_at = 0.0  # time.monotonic() of the last refresh
+        self.version = None  # data version the snapshot was refreshed at
+
+    def _reset(self) -> None:
+        self.ids = array("q")
+        self.ordinals = array("l")
+        self.months = array("l")
+        self.cents = array("q")
+        self.codes = {column: array("l") for column in CODED_COLUMNS}
+        self.dictionaries = {column: {None: 0} for column in CODED_COLUMNS}
+        self.values = {column: [None] for column in CODED_COLUMNS}
+        self.watermark: Optional[datetime] = None
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _code(self, column: str, value) -> int:
+        value = value or None  # '' is reported as "Unknown" like NULL
+        codes = self.dictionaries[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.values[column])
+            self.values[column].append(value)
+        return code
+
+    def _append(self, row) -> None:
+        record_id, updated_at, delivered, price = row[:4]
+        ordinal = delivered.toordinal()
+        self.ids.append(record_id)
+        self.ordinals.append(ordinal)
+        self.months.append(_month_index(ordinal))
+        self.cents.append(_cents(price))
+        for column, value in zip(CODED_COLUMNS, row[4:]):
+            self.codes[column].append(self._code(column, value))
+
+    def _replace(self, position: int, row) -> None:
+        ordinal = row[2].toordinal()
+        self.ordinals[position] = ordinal
+        self.months[position] = _month_index(ordinal)
+        self.cents[position] = _cents(row[3])
+        for column, value in zip(CODED_COLUMNS, row[4:]):
+            self.codes[column][position] = self._code(column, value)
+
+    def _load(self, db: Session) -> None:
+        self._reset()
+        for row in db.execute(select(*_SELECT_COLUMNS).order_by(Record.id)).yield_per(10000):
+            self._append(row)
+            if self.watermark is None or row[1] > self.watermark:
+                self.watermark = row[1]
+
+    def refresh(self, db: Session, version=None) -> None:
+        """Apply rows changed since the last refresh; rebuild if rows were deleted or reordered"""
+        with self._lock:
+            self._arrays = None  # NumPy views pin the buffers; release them before resizing
+            if self.watermark is None:
+                self._load(db)
+            else:
+                changed = db.execute(
+                    select(*_SELECT_COLUMNS)
+                    .where(Record.updated_at >= self.watermark - REFRESH_OVERLAP)
+                    .order_by(Record.id)
+                ).all()
+                rebuild = False
+                for row in changed:
+                    position = bisect_left(self.ids, row[0])
+                    if position < len(self.ids) and self.ids[position] == row[0]:
+                        self._replace(position, row)
+                    elif position == len(self.ids):
+                        self._append(row)
+                    else:
+                        rebuild = True  # an id below the newest one appeared; keep ids sorted
+                        break
+                    if row[1] > self.watermark:
+                        self.watermark = row[1]
+                if rebuild or db.scalar(select(func.count(Record.id))) != len(self.ids):
+                    self._load(db)
+            self.refreshed_at = time.monotonic()
+            self.version = version
+
+    def _numpy_arrays(self) -> dict:
+        if self._arrays is None:
+            self._arrays = {
+                "ordinals": np.frombuffer(self.ordinals, dtype=np.dtype(self.ordinals.typecode)),
+                "months": np.frombuffer(self.months, dtype=np.dtype(self.months.typecode)),
+                "cents": np.frombuffer(self.cents, dtype=np.int64),
+                **{column: np.frombuffer(codes, dtype=np.dtype(codes.typecode)) for column, codes in self.codes.items()},
+            }
+        return self._arrays
+
+    def summarize(self, filters: Optional[RecordFilters], dialect: str) -> Optional[dict]:
+        """
+        Aggregates for the filtered records: totals, per-column breakdowns and
+        monthly trends, or None if the filters need the database (text search).
+        """
+        filters = filters or RecordFilters()
+        if filters.search and filters.search.strip():
+            return None
+        with self._lock:
+            equals = {}
+            for column in CODED_COLUMNS:
+                value = getattr(filters, column)
+                if value:
+                    # A value never seen matches no rows
+                    equals[column] = self.dictionaries[column].get(value, -1)
+            first_day, last_day = delivery_date_bounds(filters, dialect)
+            first = first_day.toordinal() if first_day else None
+            last = last_day.toordinal() if last_day else None
+            if np is not None:
+                return self._summarize_numpy(equals, first, last)
+            return self._summarize_python(equals, first, last)
+
+    def _summarize_numpy(self, equals: dict, first: Optional[int], last: Optional[int]) -> dict:
+        arrays = self._numpy_arrays()
+        mask = np.ones(len(self.ids), dtype=bool)
+        for column, code in equals.items():
+            mask &= arrays[column] == code
+        if first is not None:
+            mask &= arrays["ordinals"] >= first
+        if last is not None:
+            mask &= arrays["ordinals"] <= last
+
+        cents = arrays["cents"]
+        priced = mask & (cents != 0)
+        priced_cents = cents[priced]
+        result = {
+            "total_records": int(mask.sum()),
+            "priced_count": int(priced.sum()),
+            "revenue": int(priced_cents.sum()) / 100,
+            "highest": int(priced_cents.max()) / 100 if priced_cents.size else None,
+            "lowest": int(priced_cents.min()) / 100 if priced_cents.size else None,
+            "breakdowns": {},
+        }
+        for column in BREAKDOWN_COLUMNS:
+            codes = arrays[column]
+            size = len(self.values[column])
+            counts = np.bincount(codes[mask], minlength=size)
+            revenue = np.bincount(codes[priced], weights=priced_cents, minlength=size)
+            priced_counts = np.bincount(codes[priced], minlength=size)
+            result["breakdowns"][column] = self._label(
+                column,
+                {code: int(counts[code]) for code in np.nonzero(counts)[0]},
+                {code: float(revenue[code]) / 100 for code in np.nonzero(priced_counts)[0]},
+            )
+
+        months = arrays["months"][mask]
+        monthly = []
+        if months.size:
+            low = int(months.min())
+            counts = np.bincount(months - low)
+            revenue = np.bincount(arrays["months"][priced] - low, weights=priced_cents, minlength=len(counts))
+            for offset in np.nonzero(counts)[0][-12:]:
+                monthly.append((low + int(offset), int(counts[offset]), float(revenue[offset]) / 100))
+        result["monthly"] = monthly
+        return result
+
+    def _summarize_python(self, equals: dict, first: Optional[int], last: Optional[int]) -> dict:
+        coded = [self.codes[column] for column in equals]
+        wanted = list(equals.values())
+        breakdown_codes = [self.codes[column] for column in BREAKDOWN_COLUMNS]
+        total = priced_count = revenue = 0
+        highest = lowest = None
+        counts = [{} for _ in BREAKDOWN_COLUMNS]
+        revenues = [{} for _ in BREAKDOWN_COLUMNS]
+        monthly = {}
+
+        for i, ordinal in enumerate(self.ordinals):
+            if first is not None and ordinal < first or last is not None and ordinal > last:
+                continue
+            if any(codes[i] != code for codes, code in zip(coded, wanted)):
+                continue
+            total += 1
+            cents = self.cents[i]
+            month = monthly.setdefault(self.months[i], [0, 0])
+            month[0] += 1
+            for k, codes in enumerate(breakdown_codes):
+                code = codes[i]
+                counts[k][code] = counts[k].get(code, 0) + 1
+                if cents:
+                    revenues[k][code] = revenues[k].get(code, 0) + cents
+            if cents:
+                priced_count += 1
+                revenue += cents
+                month[1] += cents
+                highest = cents if highest is None else max(highest, cents)
+                lowest = cents if lowest is None else min(lowest, cents)
+
+        return {
+            "total_records": total,
+            "priced_count": priced_count,
+            "revenue": revenue / 100,
+            "highest": highest / 100 if highest is not None else None,
+            "lowest": lowest / 100 if lowest is not None else None,
+            "breakdowns": {
+                column: self._label(
+                    column, counts[k], {code: cents / 100 for code, cents in revenues[k].items()}
+                )
+                for k, column in enumerate(BREAKDOWN_COLUMNS)
+            },
+            "monthly": [
+                (month, count, cents / 100) for month, (count, cents) in sorted(monthly.items())[-12:]
+            ],
+        }
+
+    def _label(self, column: str, counts: dict, revenue: dict) -> tuple[dict, dict]:
+        values = self.values[column]
+        return (
+            {values[code] or "Unknown": count for code, count in counts.items()},
+            {values[code] or "Unknown": total for code, total in revenue.items()},
+        )
+
+
+sales_snapshot = SalesSnapshot()
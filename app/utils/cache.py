@@ -0,0 +1,173 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.config import settings
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with a per-entry TTL and a bounded number of entries.
+    Each worker process fills its own; keys carry the shared data version, so
+    a write in any process still makes every older entry unreachable.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers get their own copy so cached values cannot be mutated in place
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache shared by all worker processes through a Redis-compatible server"""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: int, prefix: str = "crm:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend requires the 'redis' package") from e
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(self.prefix + key, json.dumps(value, separators=(",", ":")), ex=self.ttl)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self.prefix}*"):
+            self._client.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """
+    Cache of computed responses keyed by request parameters and a data version
+    (a data_versions row, bumped by every write to that data), so a write makes
+    every older entry unreachable. Backend errors are counted and treated as
+    misses; the cache never fails a request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._backend = None
+        self._backend_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = _create_backend()
+        return self._backend
+
+    def key(self, params: dict, version: int) -> str:
+        """Cache key for normalized params at a data version"""
+        payload = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"{self.name}:{version}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        backend = self.backend  # misconfiguration should fail loudly, not read as a miss
+        try:
+            value = backend.get(key)
+        except Exception:
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self.backend.set(key, value)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        try:
+            entries = self.backend.size()
+        except Exception:
+            entries = None
+        return {
+            "name": self.name,
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": getattr(self.backend, "max_entries", None),
+            "ttl": self.backend.ttl
+        }
+
+
+def _create_backend():
+    """Cache backend selected by settings.response_cache_backend"""
+    if settings.response_cache_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCacheBackend(settings.redis_url, settings.response_cache_ttl)
+    return MemoryCacheBackend(settings.response_cache_max_entries, settings.response_cache_ttl)
+
+
+sales_summary_cache = ResponseCache("sales_summary")
+
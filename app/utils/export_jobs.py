@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.database import SessionLocal
+from app.schemas import RecordFilters
+from app.crud import iter_record_rows
+from app.utils.export_utils import export_columns, pdf_columns, iter_csv, write_xlsx
+from app.utils.pdf_export import write_pdf_to_path
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+# Export kind -> (role allowed to run it, PDF title)
+EXPORT_KINDS = {
+    "records": ("maintenance", "Records Export"),
+    "sales": ("sales", "Sales Records Export"),
+}
+
+def job_key(kind: str, fmt: str, filters: RecordFilters, version: int) -> str:
+    """Hash identifying identical export requests over unchanged data (version: the records data version)"""
+    payload = json.dumps(
+        [kind, fmt, filters.model_dump(mode="json", exclude_none=True), version],
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ExportJobQueue:
+    """
+    Runs exports in a thread pool and keeps the artifacts in export_dir.
+    Each job's state is also written next to its artifact as <id>.json, so any
+    worker process sharing the directory can report status and serve downloads.
+    Identical requests (same kind, format and filters, no record written since)
+    share one job until it expires.
+    """
+
+    def __init__(self, export_dir: str, workers: int, ttl: int):
+        self.export_dir = export_dir
+        self.ttl = ttl
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: dict[str, dict] = {}
+        self._by_key: dict[str, str] = {}
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fmt: str, filters: RecordFilters, version: int) -> dict:
+        """Queue an export, or return the live job for the same request at the same records version"""
+        self.cleanup()
+        key = job_key(kind, fmt, filters, version)
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing and existing["status"] != "failed":
+                return dict(existing)
+
+            now = time.time()
+            job = {
+                "id": uuid.uuid4().hex,
+                "key": key,
+                "kind": kind,
+                "format": fmt,
+                "filters": filters.model_dump(mode="json", exclude_none=True),
+                "status": "queued",
+                "created_at": now,
+                "finished_at": None,
+                "expires_at": now + self.ttl,
+                "size": None,
+                "error": None,
+            }
+            self._jobs[job["id"]] = job
+            self._by_key[key] = job["id"]
+            self._save(job)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="export-job")
+            self._futures[job["id"]] = self._executor.submit(self._run, dict(job), filters)
+            return dict(job)
+
+    async def wait(self, job_id: str) -> Optional[dict]:
+        """Wait without blocking the event loop until a job of this process finishes; returns its state"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job state from this process or, failing that, from disk; None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            job = dict(job) if job else None
+        if job is None:
+            job = self._load(job_id)
+        if job is None or _is_expired(job, time.time()):
+            return None
+        return job
+
+    def artifact_path(self, job: dict) -> str:
+        return os.path.join(self.export_dir, f"{job['id']}.{job['format']}")
+
+    def cleanup(self) -> int:
+        """Delete expired jobs and their files; returns the number removed"""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if _is_expired(job, now)]
+            for job in expired:
+                del self._jobs[job["id"]]
+                self._futures.pop(job["id"], None)
+                if self._by_key.get(job["key"]) == job["id"]:
+                    del self._by_key[job["key"]]
+
+        removed = 0
+        if not os.path.isdir(self.export_dir):
+            return removed
+        # Also covers jobs created by other processes or before a restart
+        for name in os.listdir(self.export_dir):
+            if not name.endswith(".json"):
+                continue
+            job = self._load(name[:-len(".json")])
+            if job is not None and _is_expired(job, now):
+                for path in (self.artifact_path(job), self._state_path(job["id"])):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+        return removed
+
+    def _run(self, job: dict, filters: RecordFilters) -> None:
+        job_id = job["id"]
+        self._update(job_id, status="running")
+        path = self.artifact_path(job)
+        tmp_path = f"{path}.part"
+        db = SessionLocal()
+        try:
+            if job["format"] == "csv":
+                with open(tmp_path, "wb") as f:
+                    for chunk in iter_csv(iter_record_rows(db, filters, export_columns())):
+                        f.write(chunk)
+            elif job["format"] == "xlsx":
+                with write_xlsx(iter_record_rows(db, filters, export_columns())) as xlsx_file, \
+                        open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(xlsx_file, f)
+            else:
+                _, title = EXPORT_KINDS[job["kind"]]
+                write_pdf_to_path(
+                    tmp_path,
+                    iter_record_rows(db, filters, pdf_columns()),
+                    title,
+                    rows_per_chunk=settings.pdf_export_rows_per_chunk,
+                    workers=settings.pdf_export_workers or None
+                )
+            os.replace(tmp_path, path)
+            finished_at = time.time()
+            self._update(
+                job_id, status="done", finished_at=finished_at,
+                expires_at=finished_at + self.ttl, size=os.path.getsize(path)
+            )
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._update(job_id, status="failed", finished_at=time.time(), error=str(e))
+        finally:
+            db.close()
+
+    def _update(self, job_id: str, **changes) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:  # expired and cleaned up while running
+                return
+            job.update(changes)
+            if changes.get("status") == "failed" and self._by_key.get(job["key"]) == job_id:
+                del self._by_key[job["key"]]
+            self._save(job)
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.export_dir, f"{job_id}.json")
+
+    def _save(self, job: dict) -> None:
+        os.makedirs(self.export_dir, exist_ok=True)
+        tmp_path = f"{self._state_path(job['id'])}.part"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._state_path(job["id"]))
+
+    def _load(self, job_id: str) -> Optional[dict]:
+        if not job_id or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(self._state_path(job_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def _is_expired(job: dict, now: float) -> bool:
+    # Queued and running jobs are kept; their expiry restarts when they finish
+    return job["status"] in ("done", "failed") and job["expires_at"] < now
+
+
+def job_timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value is not None else None
+
+
+export_jobs = ExportJobQueue(settings.export_dir, settings.export_job_workers, settings.export_job_ttl)
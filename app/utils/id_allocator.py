@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event, text, update, select, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import RecordIdCounter
+
+RECORD_ID_PREFIX = "RMZ-"
+COUNTER_NAME = "record_id"
+
+
+def format_record_id(number: int) -> str:
+    """Format a record number as a record ID, e.g. RMZ-000001"""
+    return f"{RECORD_ID_PREFIX}{number:06d}"
+
+
+def parse_record_number(record_id: str) -> int | None:
+    """Numeric part of a generated record ID, or None for other formats"""
+    match = re.fullmatch(rf"{RECORD_ID_PREFIX}(\d+)", record_id or "")
+    return int(match.group(1)) if match else None
+
+
+def _max_existing_number(conn) -> int:
+    """Highest RMZ- number already used in records (0 if none)"""
+    if conn.dialect.name == "postgresql":
+        condition = "record_id ~ '^RMZ-[0-9]+$'"
+    else:
+        condition = "record_id GLOB 'RMZ-[0-9]*'"
+    return conn.execute(text(
+        f"SELECT max(CAST(substr(record_id, 5) AS INTEGER)) FROM records WHERE {condition}"
+    )).scalar() or 0
+
+
+class RecordIdAllocator:
+    """
+    Hands out record numbers from blocks reserved in the record_id_counters table.
+    
+    Each reservation atomically advances the shared counter by block_size
+    (the UPDATE holds the row lock on PostgreSQL and the write lock on
+    SQLite), so processes never receive overlapping ranges. Numbers within a
+    block are then handed out from memory without touching the database.
+    Numbers left in a block when a process exits are skipped, not reused.
+    
+    On PostgreSQL a reservation commits in its own short transaction so the
+    counter row is not locked until the caller commits. SQLite has a single
+    writer, and a caller that has already flushed holds it, so there the
+    reservation runs in the caller's session and commits with it; a rollback
+    of that session drops the block along with the reservation.
+    
+    advance_past drops this process's block when it may contain the explicit
+    ID. A block held by another process can still contain it; that insert
+    fails on the unique record_id constraint and crud retries it with a
+    number from a fresh block (see discard_block).
+    """
+
+    def __init__(self, engine: Engine, block_size: int = 20):
+        self.engine = engine
+        self.block_size = block_size
+        self._lock = threading.RLock()
+        self._next = 0
+        self._end = 0
+        self._pid = os.getpid()
+
+    def allocate(self, count: int = 1, session: Session | None = None) -> list[int]:
+        """Return count unused record numbers (session: the caller's, see class docstring)"""
+        numbers = []
+        with self._lock:
+            # A forked worker must not reuse the parent's block
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._end = 0
+
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._next, self._end = self._reserve(max(self.block_size, count - len(numbers)), session)
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+        return numbers
+
+    def advance_past(self, number: int, session: Session | None = None) -> None:
+        """
+        Make sure future reservations start after number, and drop this
+        process's block if it may contain explicitly supplied IDs up to
+        number (call before inserting them).
+        """
+        with self._writer(session) as conn:
+            conn.execute(
+                update(RecordIdCounter)
+                .where(RecordIdCounter.name == COUNTER_NAME, RecordIdCounter.next_value <= number)
+                .values(next_value=number + 1)
+            )
+        with self._lock:
+            if self._next <= number:
+                self._next = self._end = 0
+
+    def discard_block(self) -> None:
+        """Drop the rest of the current block (after one of its numbers turned out to be taken)"""
+        with self._lock:
+            self._next = self._end = 0
+
+    @contextmanager
+    def _writer(self, session: Session | None):
+        """Connection for a counter update: the caller's session on SQLite, else a short transaction"""
+        if session is not None and self.engine.dialect.name == "sqlite":
+            yield session.connection()
+        else:
+            with self.engine.begin() as conn:
+                yield conn
+
+    def _drop_if_current(self, end: int) -> None:
+        with self._lock:
+            if self._end == end:
+                self._next = self._end = 0
+
+    def _reserve(self, size: int, session: Session | None = None) -> tuple[int, int]:
+        """Atomically reserve [start, end) from the shared counter"""
+        start, end = self._update_counter(size, session)
+        if session is not None and self.engine.dialect.name == "sqlite":
+            _forget_unless_committed(session, self, end)
+        return start, end
+
+    def _update_counter(self, size: int, session: Session | None) -> tuple[int, int]:
+        with self._writer(session) as conn:
+            result = conn.execute(
+                update(RecordIdCounter)
+                .where(RecordIdCounter.name == COUNTER_NAME)
+                .values(next_value=RecordIdCounter.next_value + size)
+            )
+            if result.rowcount == 0:
+                # First use: seed the counter from the IDs already in records
+                start = _max_existing_number(conn) + 1
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(RecordIdCounter).values(name=COUNTER_NAME, next_value=start + size))
+                    return start, start + size
+                except IntegrityError:
+                    # Another process seeded it first; reserve normally
+                    conn.execute(
+                        update(RecordIdCounter)
+                        .where(RecordIdCounter.name == COUNTER_NAME)
+                        .values(next_value=RecordIdCounter.next_value + size)
+                    )
+            end = conn.execute(
+                select(RecordIdCounter.next_value).where(RecordIdCounter.name == COUNTER_NAME)
+            ).scalar_one()
+        return end - size, end
+
+
+_PENDING_BLOCKS = "record_id_pending_blocks"
+
+
+def _forget_unless_committed(session: Session, allocator: RecordIdAllocator, end: int) -> None:
+    """Drop a block reserved in session's transaction if that transaction rolls back"""
+    pending = session.info.get(_PENDING_BLOCKS)
+    if pending is None:
+        pending = session.info[_PENDING_BLOCKS] = []
+        event.listen(session, "after_commit", _keep_pending_blocks)
+        event.listen(session, "after_transaction_end", _drop_pending_blocks)
+    pending.append((allocator, end))
+
+
+def _keep_pending_blocks(session: Session) -> None:
+    session.info[_PENDING_BLOCKS].clear()
+
+
+def _drop_pending_blocks(session: Session, transaction) -> None:
+    # Still pending when the outermost transaction ends means it rolled back
+    if transaction.parent is None:
+        for allocator, end in session.info[_PENDING_BLOCKS]:
+            allocator._drop_if_current(end)
+        session.info[_PENDING_BLOCKS].clear()
+
+
+_allocators: dict[int, RecordIdAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_allocator(engine: Engine, block_size: int) -> RecordIdAllocator:
+    """Process-wide allocator for an engine"""
+    with _allocators_lock:
+        allocator = _allocators.get(id(engine))
+        if allocator is None:
+            allocator = _allocators[id(engine)] = RecordIdAllocator(engine, block_size)
+        return allocator
@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, BinaryIO, Iterator, Optional
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.schemas import RecordCreate
+from app.crud import allocate_record_ids, reserve_record_ids, discard_record_id_block, bulk_insert_records
+from app.utils.export_utils import EXPORT_FIELDS, EXPORT_HEADERS
+
+IMPORT_FORMATS = {"csv", "xlsx", "jsonl"}
+
+# Columns assigned by the database; ignored when present in an import file
+IGNORED_FIELDS = {"id", "created_at", "updated_at"}
+
+# Accept both export headers ("Client Name") and field names ("client_name")
+HEADER_TO_FIELD = {header.lower(): field for header, field in zip(EXPORT_HEADERS, EXPORT_FIELDS)}
+HEADER_TO_FIELD.update({field: field for field in RecordCreate.model_fields})
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Guess the import format from a file name"""
+    if not filename or "." not in filename:
+        return None
+    extension = filename.rsplit(".", 1)[1].lower()
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def _clean_value(field: str, value: Any) -> Any:
+    """Normalize a raw cell value: blanks become None, numeric cells in text fields become strings"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and field != "sale_price":
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
+    return value
+
+
+def _map_row(headers: list[Optional[str]], values) -> dict:
+    """Map a row of cell values to record fields using the header row"""
+    data = {}
+    for header, value in zip(headers, values):
+        field = HEADER_TO_FIELD.get(str(header).strip().lower()) if header is not None else None
+        if field and field not in IGNORED_FIELDS:
+            data[field] = _clean_value(field, value)
+    return data
+
+
+def iter_import_rows(file: BinaryIO, fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Parse an import file into (row_number, data, error) tuples.
+    row_number is the 1-based position of the data row; data is None when
+    the row could not be parsed, with error describing why.
+    """
+    if fmt == "csv":
+        reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+        headers = next(reader, [])
+        for row_number, values in enumerate(reader, 1):
+            if any(value.strip() for value in values):
+                yield row_number, _map_row(headers, values), None
+    elif fmt == "xlsx":
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = list(next(rows, []))
+            for row_number, values in enumerate(rows, 1):
+                if any(value not in (None, "") for value in values):
+                    yield row_number, _map_row(headers, values), None
+        finally:
+            wb.close()
+    elif fmt == "jsonl":
+        for row_number, line in enumerate(io.TextIOWrapper(file, encoding="utf-8-sig"), 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(item, dict):
+                yield row_number, None, "Expected a JSON object"
+                continue
+            yield row_number, {
+                field: _clean_value(field, value)
+                for field, value in item.items()
+                if field in RecordCreate.model_fields
+            }, None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _format_validation_error(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()]
+
+
+def import_records(
+    db: Session,
+    file: BinaryIO,
+    fmt: str,
+    batch_size: int = 500,
+    keep_record_ids: bool = False
+) -> dict:
+    """
+    Validate and insert records from a CSV/XLSX/JSON Lines file in batches.
+    Each batch is validated against RecordCreate, gets its record IDs in one
+    block and is inserted in its own transaction; invalid rows are reported
+    per row without aborting the load.
+    With keep_record_ids, record_id values present in the file are kept.
+    """
+    rows = iter_import_rows(file, fmt)
+    total = 0
+    inserted = 0
+    errors = []
+
+    while batch := list(islice(rows, batch_size)):
+        total += len(batch)
+        valid_rows = []
+        for row_number, data, error in batch:
+            if error:
+                errors.append({"row": row_number, "errors": [error]})
+                continue
+            provided_id = data.get("record_id") if keep_record_ids else None
+            try:
+                record = RecordCreate.model_validate({**data, "record_id": provided_id or ""})
+            except ValidationError as e:
+                errors.append({"row": row_number, "errors": _format_validation_error(e)})
+                continue
+            valid_rows.append((row_number, record.model_dump(), provided_id))
+
+        # Keep explicit IDs out of the generated range, then allocate the rest in one block
+        reserve_record_ids(db, [provided_id for *_, provided_id in valid_rows if provided_id])
+        new_ids = iter(allocate_record_ids(db, sum(1 for *_, provided_id in valid_rows if not provided_id)))
+        for _, record_data, provided_id in valid_rows:
+            if not provided_id:
+                record_data["record_id"] = next(new_ids)
+
+        insert_errors = bulk_insert_records(db, [record_data for _, record_data, _ in valid_rows])
+        # A generated ID can collide with an explicit ID another process inserted
+        # from this process's block; retry those rows once with fresh IDs
+        retry = [i for i, error in enumerate(insert_errors) if error and not valid_rows[i][2]]
+        if retry:
+            discard_record_id_block(db)
+            for i, record_id in zip(retry, allocate_record_ids(db, len(retry))):
+                valid_rows[i][1]["record_id"] = record_id
+            for i, error in zip(retry, bulk_insert_records(db, [valid_rows[i][1] for i in retry])):
+                insert_errors[i] = error
+        for (row_number, _, _), error in zip(valid_rows, insert_errors):
+            if error:
+                errors.append({"row": row_number, "errors": [error]})
+            else:
+                inserted += 1
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "total": total,
+        "inserted": inserted,
+        "failed": total - inserted,
+        "errors": errors
+    }
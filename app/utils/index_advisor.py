@@ -0,0 +1,193 @@
+"""
+Index advisor for the records table, driven by the query log.
+
+Each logged query shape (equality filters, date range, sort column) is best
+served by one composite index: the equality columns first, then the sort
+column (which also serves a date range on the same column), then id for the
+keyset tie-break, so the database reads the page in index order instead of
+filtering one index and sorting the matches. Shapes below a share of the
+log are ignored, and keys that are a prefix of a longer proposed key are
+folded into it.
+
+Single-column filter indexes are reported as drop candidates when no logged
+query filters on their column, or when a composite index starts with it.
+"""
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+from app.utils.query_log import EQUALITY_FILTERS
+from app.utils.pagination import KEYSET_SORT_COLUMNS
+
+# Single-column indexes the advisor may propose dropping (the list filters only;
+# date_of_delivery serves the warranty queries and updated_at the validators and delta sync)
+DROPPABLE_COLUMNS = set(EQUALITY_FILTERS)
+
+
+class QueryShape(NamedTuple):
+    equals: tuple[str, ...]
+    ranges: tuple[str, ...]
+    sort: str
+
+
+class IndexProposal(NamedTuple):
+    name: str
+    columns: tuple[str, ...]
+    queries: int  # logged queries the index serves
+    share: float
+
+
+class IndexDrop(NamedTuple):
+    name: str
+    columns: tuple[str, ...]
+    reason: str
+
+
+def index_name(columns: Iterable[str]) -> str:
+    return "idx_" + "_".join(columns)
+
+
+def read_query_log(lines: Iterable[str]) -> Counter:
+    """Count QueryShapes in query log lines; text searches are skipped (served by the search indexes)"""
+    shapes = Counter()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("search"):
+            continue
+        shapes[QueryShape(tuple(entry.get("equals", ())), tuple(entry.get("ranges", ())), entry.get("sort", ""))] += 1
+    return shapes
+
+
+def index_key(shape: QueryShape, column_order: dict[str, int], max_equals: int = 2) -> Optional[tuple[str, ...]]:
+    """Composite index columns serving a query shape, or None if an index cannot help its order"""
+    # Equality columns in one global order (most used first) so shapes can share prefixes
+    equals = sorted(shape.equals, key=lambda column: (column_order.get(column, 0), column))[:max_equals]
+    if shape.sort not in KEYSET_SORT_COLUMNS:
+        # Unindexable sort (e.g. sale_price): equality prefix plus the date range only
+        key = tuple(equals) + tuple(shape.ranges[:1])
+        return key or None
+    if shape.sort == "id":
+        return tuple(equals) + ("id",) if equals else None
+    return tuple(equals) + (shape.sort, "id")
+
+
+def _covered(key: tuple[str, ...], indexes: Iterable[tuple[str, ...]]) -> bool:
+    # An index serves key if it starts with it; the trailing id is implied by the row id
+    # (SQLite rowid, and the primary key tie-break PostgreSQL can add cheaply)
+    prefix = key[:-1] if key and key[-1] == "id" else key
+    return any(tuple(columns[:len(key)]) == key or tuple(columns) == prefix for columns in indexes)
+
+
+def propose_indexes(
+    shapes: Counter,
+    existing: dict[str, tuple[str, ...]],
+    min_share: float = 0.02,
+    max_equals: int = 2
+) -> list[IndexProposal]:
+    """Composite indexes serving at least min_share of the logged queries, missing from existing"""
+    total = sum(shapes.values())
+    if not total:
+        return []
+    column_usage = Counter()
+    for shape, count in shapes.items():
+        for column in shape.equals:
+            column_usage[column] += count
+    column_order = {column: rank for rank, (column, _) in enumerate(column_usage.most_common())}
+
+    served = Counter()
+    for shape, count in shapes.items():
+        key = index_key(shape, column_order, max_equals)
+        if key:
+            served[key] += count
+
+    # Fold keys into longer keys they prefix (the longer index serves both)
+    for key in sorted(served, key=len):
+        longer = [other for other in served if len(other) > len(key) and other[:len(key)] == key]
+        if longer:
+            target = max(longer, key=lambda other: served[other])
+            served[target] += served.pop(key)
+
+    proposals = []
+    for key, count in served.most_common():
+        if count / total < min_share or _covered(key, existing.values()):
+            continue
+        proposals.append(IndexProposal(index_name(key), key, count, round(count / total, 4)))
+    return proposals
+
+
+def unused_indexes(
+    shapes: Counter,
+    existing: dict[str, tuple[str, ...]],
+    proposals: list[IndexProposal]
+) -> list[IndexDrop]:
+    """Single-column filter indexes that no logged query needs"""
+    filtered = {column for shape in shapes for column in shape.equals}
+    composites = [columns for columns in existing.values() if len(columns) > 1]
+    composites += [proposal.columns for proposal in proposals]
+
+    drops = []
+    for name, columns in sorted(existing.items()):
+        if len(columns) != 1 or columns[0] not in DROPPABLE_COLUMNS:
+            continue
+        column = columns[0]
+        if any(composite[0] == column for composite in composites):
+            drops.append(IndexDrop(name, columns, f"redundant: a composite index starts with {column}"))
+        elif column not in filtered:
+            drops.append(IndexDrop(name, columns, f"no logged query filters on {column}"))
+    return drops
+
+
+def render_migration(
+    proposals: list[IndexProposal],
+    drops: list[IndexDrop],
+    down_revision: Optional[str],
+    message: str = "Add composite record indexes",
+    revision: Optional[str] = None
+) -> tuple[str, str]:
+    """Alembic migration creating proposals and dropping drops; returns (revision, source)"""
+    revision = revision or uuid.uuid4().hex[-12:]
+    upgrade, downgrade = [], []
+    for proposal in proposals:
+        upgrade.append(f"    # Serves {proposal.queries} logged queries ({proposal.share:.1%})")
+        upgrade.append(f"    op.create_index('{proposal.name}', 'records', {list(proposal.columns)!r})")
+        downgrade.insert(0, f"    op.drop_index('{proposal.name}', table_name='records')")
+    for drop in drops:
+        upgrade.append(f"    # {drop.reason}")
+        upgrade.append(f"    op.drop_index('{drop.name}', table_name='records')")
+        downgrade.insert(0, f"    op.create_index('{drop.name}', 'records', {list(drop.columns)!r})")
+
+    source = f'''"""{message}
+
+Generated by advise_indexes.py from the query log.
+
+Revision ID: {revision}
+Revises: {down_revision or ''}
+Create Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")}
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '{revision}'
+down_revision: Union[str, None] = {down_revision!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+{chr(10).join(upgrade) or "    pass"}
+
+
+def downgrade() -> None:
+{chr(10).join(downgrade) or "    pass"}
+'''
+    return revision, source
@@ -0,0 +1,201 @@
+"""
+Per-request performance instrumentation.
+
+MetricsMiddleware times each request and collects, through a context
+variable, the SQL statements executed (count and time, from engine events)
+and the ORM rows hydrated while serving it. Totals are kept per route and
+rendered in the Prometheus text format by metrics_registry.render(); each response
+also gets a Server-Timing header. Metrics are per worker process.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+# Latency histogram bucket upper bounds, in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Work done while serving one request"""
+
+    __slots__ = ("sql_count", "sql_time", "rows")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.rows = 0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, or None outside a request"""
+    return _current_stats.get()
+
+
+class RouteMetrics:
+    """Latency histogram and SQL/row totals for one (method, route)"""
+
+    __slots__ = ("bucket_counts", "count", "duration_sum", "sql_count", "sql_time", "rows", "statuses")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.duration_sum = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.statuses: dict[int, int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.bucket_counts[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            metrics.count += 1
+            metrics.duration_sum += duration
+            metrics.sql_count += stats.sql_count
+            metrics.sql_time += stats.sql_time
+            metrics.rows += stats.rows
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), m in routes:
+                labels = f'method="{method}",route="{_escape(route)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS + (None,), m.bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound is None else repr(bound)
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {m.duration_sum}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {m.count}")
+
+            lines += ["# HELP http_requests_total Requests by route and status.", "# TYPE http_requests_total counter"]
+            for (method, route), m in routes:
+                for status, status_count in sorted(m.statuses.items()):
+                    lines.append(
+                        f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {status_count}'
+                    )
+
+            for name, attribute, help_text in (
+                ("db_queries_total", "sql_count", "SQL statements executed while serving the route."),
+                ("db_query_seconds_total", "sql_time", "Time spent executing SQL for the route."),
+                ("orm_rows_hydrated_total", "rows", "ORM objects loaded from result rows for the route."),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), m in routes:
+                    lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {getattr(m, attribute)}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_time += elapsed
+
+
+def _on_load(target, context):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Count SQL statements and their execution time for the current request"""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_orm() -> None:
+    """Count ORM objects hydrated for the current request"""
+    if not event.contains(Mapper, "load", _on_load):
+        event.listen(Mapper, "load", _on_load)
+
+
+def _route_label(scope) -> str:
+    # FastAPI stores the matched route in the scope; use its template to keep label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: collects per-request stats and adds a Server-Timing header"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - start) * 1000
+                server_timing = (
+                    f"app;dur={total_ms:.1f}, "
+                    f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries", '
+                    f'orm;desc="{stats.rows} rows"'
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", server_timing.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Streaming bodies are included: the app call returns after the last chunk is sent
+            self.registry.observe(
+                scope["method"], _route_label(scope), status, time.perf_counter() - start, stats
+            )
+            _current_stats.reset(token)
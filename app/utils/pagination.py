@@ -0,0 +1,88 @@
+import base64
+import json
+from datetime import datetime, date
+from typing import Any, Optional
+from app.models import Record
+
+# Non-nullable columns that can back keyset pagination (ties broken by id)
+KEYSET_SORT_COLUMNS = {"date_of_delivery", "created_at", "updated_at", "id", "record_id", "client_name"}
+
+
+class CursorExpired(ValueError):
+    """A sync cursor older than the tombstone retention; the client must sync from scratch"""
+
+
+def _encode(values: list) -> str:
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(sort_by: str, sort_desc: bool, last_value: Any, last_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    if isinstance(last_value, (date, datetime)):
+        last_value = last_value.isoformat()
+    return _encode([sort_by, sort_desc, last_value, last_id])
+
+
+def decode_cursor(cursor: str) -> tuple[str, bool, Any, int]:
+    """
+    Decode a cursor created by encode_cursor.
+    Returns (sort_by, sort_desc, last_value, last_id); raises ValueError if invalid.
+    """
+    try:
+        sort_by, sort_desc, last_value, last_id = _decode(cursor)
+        if sort_by not in KEYSET_SORT_COLUMNS or not isinstance(last_id, int):
+            raise ValueError("Unsupported cursor sort")
+
+        python_type = getattr(Record, sort_by).type.python_type
+        if python_type is datetime:
+            last_value = datetime.fromisoformat(last_value)
+        elif python_type is date:
+            last_value = date.fromisoformat(last_value)
+        elif not isinstance(last_value, python_type):
+            raise ValueError("Cursor value does not match sort column")
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    return sort_by, bool(sort_desc), last_value, last_id
+
+
+def cursor_for(records: list, sort_by: str, sort_desc: bool) -> Optional[str]:
+    """Cursor pointing after the last of records, or None if the sort is not keyset-capable"""
+    if not records or sort_by not in KEYSET_SORT_COLUMNS:
+        return None
+    last = records[-1]
+    return encode_cursor(sort_by, sort_desc, getattr(last, sort_by), last.id)
+
+
+def encode_sync_cursor(
+    last_updated: Optional[str],
+    last_id: Optional[int],
+    last_tombstone: int,
+    synced_until: datetime
+) -> str:
+    """Encode a delta sync position: the last (updated_at, id) and tombstone id sent"""
+    return _encode(["sync", last_updated, last_id, last_tombstone, synced_until.isoformat()])
+
+
+def decode_sync_cursor(cursor: str) -> tuple[Optional[str], Optional[int], int, datetime]:
+    """
+    Decode a cursor created by encode_sync_cursor.
+    Returns (last_updated, last_id, last_tombstone, synced_until); raises ValueError if invalid.
+    """
+    try:
+        kind, last_updated, last_id, last_tombstone, synced_until = _decode(cursor)
+        if kind != "sync" or not isinstance(last_tombstone, int):
+            raise ValueError("Not a sync cursor")
+        if last_updated is not None and not (isinstance(last_updated, str) and isinstance(last_id, int)):
+            raise ValueError("Invalid record position")
+        synced_until = datetime.fromisoformat(synced_until)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    return last_updated, last_id, last_tombstone, synced_until
@@ -0,0 +1,198 @@
+import io
+import itertools
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import BinaryIO, Iterable, Iterator, Optional, Sequence
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # optional: without it PDFs are built in one process
+    PdfWriter = None
+
+# Columns fetched for PDF exports, in table order
+PDF_COLUMNS = [
+    "id", "record_id", "date_of_delivery", "client_name",
+    "zone", "capacity_kw", "sale_price", "sold_by"
+]
+PDF_HEADERS = [
+    "ID", "Record ID", "Delivery Date", "Client Name",
+    "Zone", "Capacity", "Sale Price", "Sold By"
+]
+
+# Fixed widths keep the columns aligned across the per-page tables (A4 minus 0.5" margins)
+PDF_COLUMN_WIDTHS = [35, 62, 62, 130, 60, 45, 58, 71]
+
+# Rows per Table flowable: about one page, so reportlab never lays out (and splits) a huge table
+ROWS_PER_TABLE = 40
+
+# Chunks submitted to each worker process ahead of the one being merged
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+])
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def format_pdf_row(row: Sequence) -> list[str]:
+    """Format a row of PDF_COLUMNS values as table cells"""
+    id_, record_id, delivered, client_name, zone, capacity_kw, sale_price, sold_by = row
+    return [
+        str(id_),
+        record_id,
+        delivered.strftime("%Y-%m-%d") if delivered else "",
+        client_name[:30] if client_name else "",  # Truncate long names
+        zone or "",
+        capacity_kw or "",
+        f"{float(sale_price):.2f}" if sale_price else "",
+        sold_by or ""
+    ]
+
+
+def _document(output: BinaryIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(output, pagesize=A4, leftMargin=0.5 * inch, rightMargin=0.5 * inch)
+
+
+def _flowables(rows: list[list[str]], title: Optional[str]) -> list:
+    """Title (first chunk only) followed by page-sized tables"""
+    elements = []
+    if title is not None:
+        elements.append(Paragraph(title, getSampleStyleSheet()['Title']))
+        elements.append(Spacer(1, 0.2 * inch))
+    for start in range(0, max(len(rows), 1), ROWS_PER_TABLE):
+        table = Table(
+            [PDF_HEADERS] + rows[start:start + ROWS_PER_TABLE],
+            colWidths=PDF_COLUMN_WIDTHS,
+            repeatRows=1
+        )
+        table.setStyle(TABLE_STYLE)
+        elements.append(table)
+    return elements
+
+
+def render_pdf_chunk(rows: list[list[str]], title: Optional[str] = None) -> bytes:
+    """Render formatted rows as a standalone PDF (runs in a worker process)"""
+    output = io.BytesIO()
+    _document(output).build(_flowables(rows, title))
+    return output.getvalue()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned (not forked) workers: the API process has threads and open connections
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _formatted_chunks(rows: Iterable[Sequence], rows_per_chunk: int) -> Iterator[list[list[str]]]:
+    """Formatted rows in lists of rows_per_chunk, read from rows as each list fills"""
+    chunk = []
+    for row in rows:
+        chunk.append(format_pdf_row(row))
+        if len(chunk) == rows_per_chunk:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_pdf(
+    rows: Iterable[Sequence],
+    output: BinaryIO,
+    title: str = "Records Export",
+    rows_per_chunk: int = 2000,
+    workers: Optional[int] = None
+) -> None:
+    """
+    Write rows of PDF_COLUMNS values as a PDF table.
+    Rows are read in chunks of rows_per_chunk; each chunk is sent to a worker
+    process as soon as it fills, with at most CHUNKS_IN_FLIGHT_PER_WORKER
+    chunks per worker held at once, and the rendered chunks are concatenated
+    with pypdf. Without pypdf, or with a single chunk or worker, the document
+    is built in this process, which then holds every row.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _formatted_chunks(rows, rows_per_chunk)
+    first = next(chunks, [])
+    second = next(chunks, None)
+
+    if second is None or workers == 1 or PdfWriter is None:
+        formatted = first + (second or []) + [row for chunk in chunks for row in chunk]
+        _document(output).build(_flowables(formatted, title))
+        return
+
+    writer = PdfWriter()
+    pool = _get_pool(workers)
+    pending = deque()  # (future or None, chunk, title) in document order
+
+    def merge_oldest():
+        nonlocal pool
+        future, chunk, chunk_title = pending.popleft()
+        try:
+            part = future.result() if future is not None else render_pdf_chunk(chunk, chunk_title)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); drop the pool and render the rest here
+            _reset_pool()
+            pool = None
+            part = render_pdf_chunk(chunk, chunk_title)
+        writer.append(io.BytesIO(part))
+
+    for index, chunk in enumerate(itertools.chain([first, second], chunks)):
+        chunk_title = title if index == 0 else None
+        future = None
+        if pool is not None:
+            try:
+                future = pool.submit(render_pdf_chunk, chunk, chunk_title)
+            except BrokenProcessPool:
+                _reset_pool()
+                pool = None
+        pending.append((future, chunk, chunk_title))
+        while len(pending) > workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+            merge_oldest()
+    while pending:
+        merge_oldest()
+    writer.write(output)
+
+
+def write_pdf_to_path(path: str, rows: Iterable[Sequence], title: str = "Records Export", **kwargs) -> None:
+    """Write a PDF export to a file, for exports generated in the background"""
+    with open(path, "wb") as f:
+        write_pdf(rows, f, title, **kwargs)
+
+
+def pdf_file(rows: Iterable[Sequence], title: str = "Records Export", **kwargs) -> BinaryIO:
+    """Write a PDF export to a spooled temporary file, rewound for streaming"""
+    output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    write_pdf(rows, output, title, **kwargs)
+    output.seek(0)
+    return output
@@ -0,0 +1,34 @@
+import re
+from typing import Optional
+
+# Normalized numbers shorter than this are not treated as phone numbers by search
+MIN_SEARCH_DIGITS = 6
+
+_PHONE_TEXT = re.compile(r"^[\d\s()+\-./]+$")
+_COUNTRY_CODE = re.compile(r"^(\+|00)\s*91")
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Digits of a phone number in national form, for matching numbers stored in
+    different formats: "+91 98765 43210", "098765-43210" and "9876543210" all
+    become "9876543210". Returns None if the value has no digits.
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone).lstrip("0")  # 00 international and 0 trunk prefixes
+    if digits.startswith("91") and len(digits[2:].lstrip("0")) == 10:
+        digits = digits[2:].lstrip("0")  # +91 country code, with or without a trunk 0 after it
+    return digits or None
+
+
+def phone_search_key(term: str) -> Optional[str]:
+    """Normalized number for a search term that looks like a (partial) phone number, else None"""
+    if not _PHONE_TEXT.match(term):
+        return None
+    term = term.strip()
+    # A partial number typed with its country code keeps "91" in front otherwise
+    digits = normalize_phone(_COUNTRY_CODE.sub("", term))
+    if digits is None or len(digits) < MIN_SEARCH_DIGITS:
+        return None
+    return digits
@@ -0,0 +1,43 @@
+"""
+Optional log of the filter and sort combinations used by record queries.
+
+With QUERY_LOG_PATH set, every records listing and export appends one JSON
+line naming the columns it filtered on and the column it sorted by (never
+the values). advise_indexes.py reads the log to propose composite indexes.
+"""
+import json
+import threading
+import time
+from typing import Optional
+from app.config import settings
+from app.schemas import RecordFilters
+
+# RecordFilters fields compared with = and the columns they constrain
+EQUALITY_FILTERS = ["zone", "capacity_kw", "heater", "controller", "card", "body", "sold_by", "lead_source"]
+
+_lock = threading.Lock()
+
+
+def query_shape(kind: str, filters: Optional[RecordFilters], sort_by: str, sort_desc: bool) -> dict:
+    """Columns a query filters and sorts on, as written to the query log"""
+    filters = filters or RecordFilters()
+    return {
+        "kind": kind,
+        "equals": [field for field in EQUALITY_FILTERS if getattr(filters, field)],
+        "ranges": ["date_of_delivery"] if filters.date_from or filters.date_to else [],
+        "search": bool(filters.search and filters.search.strip()),
+        "sort": sort_by,
+        "desc": sort_desc,
+    }
+
+
+def log_query(kind: str, filters: Optional[RecordFilters], sort_by: str, sort_desc: bool) -> None:
+    """Append the query's shape to the query log, if enabled"""
+    path = settings.query_log_path
+    if not path:
+        return
+    entry = {"ts": int(time.time()), **query_shape(kind, filters, sort_by, sort_desc)}
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    # One short append per line, so lines from several worker processes do not interleave
+    with _lock, open(path, "a") as f:
+        f.write(line)
@@ -0,0 +1,151 @@
+import re
+from typing import Optional
+from sqlalchemy import and_, or_, text, func, literal_column, select
+from sqlalchemy.orm import Session
+from app.models import Record
+from app.utils.phone import phone_search_key
+
+# Concatenated searchable text; must match the expression indexed by the
+# PostgreSQL search migration so the planner can use those indexes
+SEARCH_DOCUMENT_SQL = (
+    "(coalesce(records.record_id, '') || ' ' || coalesce(records.client_name, '') || ' ' || "
+    "coalesce(records.client_phone, '') || ' ' || coalesce(records.client_address, ''))"
+)
+
+# Trigram FTS5 tables can only match terms of at least this many characters
+TRIGRAM_MIN_LENGTH = 3
+
+_fts_tokenizers: dict[str, Optional[str]] = {}
+
+
+def get_fts_tokenizer(db: Session) -> Optional[str]:
+    """
+    Tokenizer of the SQLite records_fts table ("trigram" or "unicode61"),
+    or None if the table has not been created by the search migration.
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fts_tokenizers:
+        sql = db.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'records_fts'")
+        ).scalar()
+        if sql is None:
+            _fts_tokenizers[key] = None
+        else:
+            _fts_tokenizers[key] = "trigram" if "trigram" in sql else "unicode61"
+    return _fts_tokenizers[key]
+
+
+def _ilike_condition(term: str):
+    """Substring match over the searchable columns (unindexed fallback)"""
+    search_term = f"%{term}%"
+    return or_(
+        Record.record_id.ilike(search_term),
+        Record.client_name.ilike(search_term),
+        Record.client_phone.ilike(search_term),
+        Record.client_address.ilike(search_term)
+    )
+
+
+def _fts_query(term: str, tokenizer: str) -> Optional[str]:
+    """Build an FTS5 MATCH expression, or None if the term cannot use the index"""
+    if tokenizer == "trigram":
+        # Trigram tables match quoted phrases as case-insensitive substrings
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return None
+        return '"' + term.replace('"', '""') + '"'
+
+    # unicode61: every word must appear, each matched as a prefix
+    tokens = re.findall(r"\w+", term)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _tsquery(term: str) -> Optional[str]:
+    """Build a prefix-matching PostgreSQL tsquery string from a search term"""
+    tokens = re.findall(r"\w+", term)
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def _text_condition(db: Session, term: str):
+    """Free-text condition of the active backend (see search_condition)"""
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        tokenizer = get_fts_tokenizer(db)
+        match = _fts_query(term, tokenizer) if tokenizer else None
+        if match is not None:
+            matching_ids = select(literal_column("rowid")).select_from(text("records_fts")).where(
+                text("records_fts MATCH :search_match").bindparams(search_match=match)
+            )
+            return Record.id.in_(matching_ids)
+    elif dialect == "postgresql":
+        # Substring match uses the pg_trgm index; word-prefix match uses the tsvector index
+        document = literal_column(SEARCH_DOCUMENT_SQL)
+        condition = document.ilike(f"%{term}%")
+        query = _tsquery(term)
+        if query is not None:
+            condition = or_(condition, func.to_tsvector(literal_column("'simple'"), document).op("@@")(
+                func.to_tsquery(literal_column("'simple'"), query)
+            ))
+        return condition
+
+    return _ilike_condition(term)
+
+
+def _digits_prefix(column, prefix: str):
+    """column starts with prefix, as a range the column's index can serve (digit strings only)"""
+    head = prefix.rstrip("9")
+    if not head:
+        return column >= prefix  # every digit string from "99..." on starts with it
+    return and_(column >= prefix, column < head[:-1] + str(int(head[-1]) + 1))
+
+
+def search_condition(db: Session, term: str):
+    """
+    Filter condition for a free-text search over record_id, client name, phone and address.
+    - SQLite: FTS5 match against records_fts when the table exists
+    - PostgreSQL: ILIKE (pg_trgm index) or word-prefix tsquery (tsvector index) on the search document
+    - otherwise: per-column ILIKE
+    Terms that look like a phone number also match client_phone_normalized by prefix,
+    so "+91 98765 43210" finds a number stored as "09876543210".
+    """
+    term = term.strip()
+    condition = _text_condition(db, term)
+    phone = phone_search_key(term)
+    if phone is not None:
+        condition = or_(condition, _digits_prefix(Record.client_phone_normalized, phone))
+    return condition
+
+
+def search_rank(db: Session, term: str):
+    """
+    Relevance expression for ordering search results (higher sorts first),
+    or None if the backend cannot rank this term.
+    """
+    term = term.strip()
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        tokenizer = get_fts_tokenizer(db)
+        match = _fts_query(term, tokenizer) if tokenizer else None
+        if match is None:
+            return None
+        # bm25() is lower for better matches, so negate it
+        return select(-func.bm25(literal_column("records_fts"))).select_from(text("records_fts")).where(
+            text("records_fts MATCH :rank_match AND records_fts.rowid = records.id").bindparams(rank_match=match)
+        ).scalar_subquery()
+    elif dialect == "postgresql":
+        query = _tsquery(term)
+        if query is None:
+            return None
+        document = literal_column(SEARCH_DOCUMENT_SQL)
+        return func.ts_rank(
+            func.to_tsvector(literal_column("'simple'"), document),
+            func.to_tsquery(literal_column("'simple'"), query)
+        )
+
+    return None
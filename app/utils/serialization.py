@@ -0,0 +1,157 @@
+"""
+Direct JSON serialization of record rows for the list endpoints.
+
+Rows are column tuples (no ORM instances); each field gets a converter chosen
+once from the column type, so a page is turned into JSON bytes without
+building Pydantic models. The output matches RecordListResponse as rendered
+by FastAPI's JSONResponse, or a subset of its fields (see serializer_for).
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
+from fastapi.responses import JSONResponse
+from app.models import Record
+from app.schemas import RecordResponse
+from app.utils.pdf_export import PDF_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the json module
+    orjson = None
+
+# Field order of RecordResponse, which the JSON object keys follow
+RECORD_FIELDS = tuple(RecordResponse.model_fields)
+
+# Named field sets for ?fields=; id is always included
+FIELD_PRESETS = {
+    # What a record card shows, without the long address and remarks text
+    "card": (
+        "record_id", "client_name", "client_phone", "zone", "date_of_delivery",
+        "capacity_kw", "heater", "controller", "body", "sale_price", "sold_by"
+    ),
+    "detail": RECORD_FIELDS,
+    # The columns of the PDF report
+    "export": tuple(PDF_COLUMNS),
+}
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def _converter(column) -> Optional[Callable]:
+    """Converter from a column value to its JSON value, or None to pass it through"""
+    python_type = column.type.python_type
+    if python_type is Decimal:
+        return _float
+    if python_type in (date, datetime) and orjson is None:
+        return _iso  # orjson writes dates and datetimes in ISO format itself
+    return None
+
+
+class RowSerializer:
+    """Columns to select for a set of record fields and a row -> dict encoder for them"""
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self.columns = [getattr(Record, field) for field in self.fields]
+        self._converters = [
+            (index, converter)
+            for index, converter in enumerate(_converter(column) for column in self.columns)
+            if converter is not None
+        ]
+
+    def row_dict(self, row: Sequence) -> dict:
+        # Rows may carry extra trailing columns (e.g. a sort key); zip drops them
+        if self._converters:
+            row = list(row)
+            for index, converter in self._converters:
+                row[index] = converter(row[index])
+        return dict(zip(self.fields, row))
+
+
+record_row_serializer = RowSerializer(RECORD_FIELDS)
+
+
+@lru_cache(maxsize=64)
+def _projection_serializer(fields: tuple[str, ...]) -> RowSerializer:
+    return RowSerializer(fields)
+
+
+def serializer_for(fields: Optional[str]) -> RowSerializer:
+    """
+    Serializer for a ?fields= value: comma-separated field names and/or preset
+    names, in any order. Output keys keep the RecordResponse order and always
+    include id. Raises ValueError for unknown names.
+    """
+    if not fields or not fields.strip():
+        return record_row_serializer
+    requested = {"id"}
+    unknown = []
+    for name in (part.strip() for part in fields.split(",")):
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            requested.update(FIELD_PRESETS[name])
+        elif name in RECORD_FIELDS:
+            requested.add(name)
+        else:
+            unknown.append(name)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}; use record fields or a preset "
+            f"({', '.join(FIELD_PRESETS)})"
+        )
+    if len(requested) == len(RECORD_FIELDS):
+        return record_row_serializer
+    return _projection_serializer(tuple(field for field in RECORD_FIELDS if field in requested))
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed (the app's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def render_record_list(
+    serializer: RowSerializer,
+    rows: list,
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str]
+) -> bytes:
+    """RecordListResponse JSON for a page of rows selected with serializer.columns"""
+    return dumps({
+        "records": [serializer.row_dict(row) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    })
+
+
+def render_record_changes(serializer: RowSerializer, rows: list, tombstones: list, next_cursor: str, has_more: bool) -> bytes:
+    """RecordChangesResponse JSON for a delta sync batch (see crud.get_record_changes)"""
+    return dumps({
+        "records": [serializer.row_dict(row) for row in rows],
+        "deleted": [
+            {"id": tombstone.record_pk, "record_id": tombstone.record_id, "deleted_at": tombstone.deleted_at.isoformat()}
+            for tombstone in tombstones
+        ],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    })
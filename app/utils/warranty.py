@@ -2,10 +2,25 @@ from datetime import datetime, date, timedelta
 from typing import Optional
 from app.models import Record
 
+WARRANTY_DAYS = 365
+
 
 def calculate_warranty_expiry(date_of_delivery: date) -> date:
     """Calculate warranty expiry (1 year from delivery date)"""
-    return date_of_delivery + timedelta(days=365)
+    return date_of_delivery + timedelta(days=WARRANTY_DAYS)
+
+
+def get_warranty_cutoffs(days_soon: int = 30, today: Optional[date] = None) -> tuple[date, date]:
+    """
+    Delivery-date cutoffs equivalent to get_warranty_status, for use in SQL.
+    Returns (expired_before, expiring_on_or_before):
+    - date_of_delivery < expired_before: out_of_warranty
+    - date_of_delivery <= expiring_on_or_before: expiring_soon
+    - otherwise: in_warranty
+    """
+    today = today or datetime.utcnow().date()
+    expired_before = today - timedelta(days=WARRANTY_DAYS)
+    return expired_before, expired_before + timedelta(days=days_soon)
 
 
 def get_warranty_status(record: Record, days_soon: int = 30) -> tuple[Optional[date], str]:
@@ -0,0 +1 @@
+# Benchmark suite: python -m benchmarks.generate_data / python -m benchmarks.run
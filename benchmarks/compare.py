@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files
+
+Prints per-scenario p50/p95/p99 and throughput changes and exits with status 1
+if any scenario's p95 regressed by more than --threshold (default 20%).
+
+Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 0.2]
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", help="Results of the reference commit")
+    parser.add_argument("candidate", help="Results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['meta']['label']} ({baseline['meta']['records']} records, {baseline['meta']['database']})")
+    print(f"candidate {candidate['meta']['label']} ({candidate['meta']['records']} records, {candidate['meta']['database']})")
+    print(f"{'scenario':24}" + "".join(f"{metric:>30}" for metric in METRICS))
+
+    regressions = []
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        cells = [
+            f"{old[metric]:.2f} → {new[metric]:.2f} ({change(old[metric], new[metric]):+.0%})"
+            for metric in METRICS
+        ]
+        print(f"{name:24}" + "".join(f"{cell:>30}" for cell in cells))
+        if change(old["p95_ms"], new["p95_ms"]) > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"p95 regressed by more than {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Compare query plans and latency of record listings without and with an index change
+
+Runs the page and count queries of representative /records listings (the most
+common shapes in a query log, or built-in zone / seller / date range shapes)
+and a 1000-row insert, once without and once with a set of index changes, and
+prints the EXPLAIN output and median latencies of both. The index change is
+the advisor's proposal for the log, or by default the composite indexes of
+migration b4e1d9a7c3f2. The original indexes are restored at the end; run it
+against a benchmark database, not production.
+
+Usage: python -m benchmarks.explain_indexes --database-url sqlite:///./bench.db [--log queries.jsonl] [--output plans.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Index change of migration b4e1d9a7c3f2: (name, columns) created and names dropped
+DEFAULT_CREATES = [
+    ("idx_zone_date_of_delivery_id", ("zone", "date_of_delivery", "id")),
+    ("idx_sold_by_date_of_delivery_id", ("sold_by", "date_of_delivery", "id")),
+]
+DEFAULT_DROPS = [("idx_zone", ("zone",)), ("idx_sold_by", ("sold_by",))]
+
+PAGE_SIZE = 50
+
+
+def _indexes(engine) -> dict[str, tuple[str, ...]]:
+    from sqlalchemy import inspect
+    return {
+        index["name"]: tuple(index["column_names"])
+        for index in inspect(engine).get_indexes("records")
+        if index["column_names"] and None not in index["column_names"]
+    }
+
+
+def _set_indexes(engine, present: list[tuple[str, tuple]], absent: list[str]) -> None:
+    """Create the present indexes that are missing and drop the absent ones that exist"""
+    from sqlalchemy import Index
+    from app.models import Record
+    existing = _indexes(engine)
+    with engine.begin() as conn:
+        for name in absent:
+            if name in existing:
+                Index(name, *[Record.__table__.c[column] for column in existing[name]]).drop(conn)
+        for name, columns in present:
+            if name not in existing:
+                Index(name, *[Record.__table__.c[column] for column in columns]).create(conn)
+
+
+def _explain(conn, statement) -> list[str]:
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    return [row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql)]
+
+
+def _median_ms(conn, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(statement).all()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def _insert_ms(engine, rows: int = 1000) -> float:
+    # Copies of existing rows inserted in a transaction that is rolled back
+    from sqlalchemy import text
+    from app.models import Record
+    columns = [column.name for column in Record.__table__.columns if column.name not in ("id", "record_id")]
+    names = ", ".join(columns)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        started = time.perf_counter()
+        conn.execute(text(
+            f"INSERT INTO records (record_id, {names}) "
+            f"SELECT record_id || '-bench', {names} FROM records ORDER BY id LIMIT {rows}"
+        ))
+        elapsed = time.perf_counter() - started
+        transaction.rollback()
+    return round(elapsed * 1000, 3)
+
+
+def _queries(db, shapes) -> list[tuple[str, object, object]]:
+    """(label, page statement, count statement) for each shape, with common filter values"""
+    from sqlalchemy import desc, func, select
+    from app.models import Record
+    from app.schemas import RecordFilters
+    from app.crud import _apply_filters
+    from app.utils.serialization import record_row_serializer
+
+    def most_common(column):
+        return db.execute(
+            select(column).where(column.isnot(None)).group_by(column).order_by(desc(func.count())).limit(1)
+        ).scalar()
+
+    newest = db.scalar(select(func.max(Record.date_of_delivery))) or datetime.utcnow().date()
+    date_to = datetime.combine(newest, datetime.max.time()).replace(microsecond=0)
+    queries = []
+    for shape in shapes:
+        values = {column: most_common(getattr(Record, column)) for column in shape.equals}
+        if shape.ranges:
+            values["date_from"] = date_to.replace(hour=0, minute=0, second=0) - timedelta(days=365)
+            values["date_to"] = date_to
+        filters = RecordFilters(**values)
+        sort_column = getattr(Record, shape.sort, Record.date_of_delivery)
+        page = _apply_filters(db.query(*record_row_serializer.columns), filters).order_by(
+            desc(sort_column), desc(Record.id)
+        ).limit(PAGE_SIZE).statement
+        count = _apply_filters(db.query(func.count(Record.id)), filters).statement
+        label = ", ".join(f"{key}={value}" for key, value in values.items()) or "no filters"
+        queries.append((f"{label}; sort {shape.sort}", page, count))
+    return queries
+
+
+def _measure(engine, queries, repeat: int) -> dict:
+    result = {"insert_1000_ms": _insert_ms(engine), "queries": {}}
+    with engine.connect() as conn:
+        for label, page, count in queries:
+            result["queries"][label] = {
+                "page_plan": _explain(conn, page),
+                "page_ms": _median_ms(conn, page, repeat),
+                "count_plan": _explain(conn, count),
+                "count_ms": _median_ms(conn, count, repeat),
+            }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare record listing query plans without and with an index change")
+    parser.add_argument("--database-url", help="Benchmark database (default: DATABASE_URL / app setting)")
+    parser.add_argument("--log", help="Query log: benchmark its most common shapes and the advisor's proposal")
+    parser.add_argument("--shapes", type=int, default=5, help="Shapes taken from the log (default: 5)")
+    parser.add_argument("--drop-unused", action="store_true", help="With --log, also drop the advisor's drop candidates")
+    parser.add_argument("--repeat", type=int, default=20, help="Executions per query for the median (default: 20)")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Imported after DATABASE_URL is set so the app engine points at the benchmark database
+    from app.database import SessionLocal, engine
+    from app.utils.index_advisor import QueryShape, read_query_log, propose_indexes, unused_indexes
+
+    original = _indexes(engine)
+    if args.log:
+        with open(args.log) as f:
+            log_shapes = read_query_log(f)
+        shapes = [shape for shape, _ in log_shapes.most_common(args.shapes)]
+        # Proposals against the indexes the "without" state has
+        baseline = {name: columns for name, columns in original.items() if name not in dict(DEFAULT_CREATES)}
+        proposals = propose_indexes(log_shapes, baseline)
+        creates = [(proposal.name, proposal.columns) for proposal in proposals]
+        drops = [(drop.name, drop.columns) for drop in unused_indexes(log_shapes, baseline, proposals)] if args.drop_unused else []
+    else:
+        shapes = [
+            QueryShape(("zone",), (), "date_of_delivery"),
+            QueryShape(("sold_by",), ("date_of_delivery",), "date_of_delivery"),
+            QueryShape(("zone", "sold_by"), ("date_of_delivery",), "date_of_delivery"),
+            QueryShape((), ("date_of_delivery",), "date_of_delivery"),
+        ]
+        creates, drops = DEFAULT_CREATES, DEFAULT_DROPS
+    if not creates and not drops:
+        print("No index change to compare", file=sys.stderr)
+        return 1
+
+    with SessionLocal() as db:
+        queries = _queries(db, shapes)
+    try:
+        _set_indexes(engine, drops, [name for name, _ in creates])
+        without = _measure(engine, queries, args.repeat)
+        _set_indexes(engine, creates, [name for name, _ in drops])
+        with_change = _measure(engine, queries, args.repeat)
+    finally:
+        current = _indexes(engine)
+        _set_indexes(
+            engine,
+            [(name, columns) for name, columns in original.items()],
+            [name for name in current if name not in original]
+        )
+
+    print(f"Created: {', '.join(name for name, _ in creates) or '-'}; dropped: {', '.join(name for name, _ in drops) or '-'}")
+    print(f"Insert 1000 rows: {without['insert_1000_ms']:.1f} ms -> {with_change['insert_1000_ms']:.1f} ms")
+    for label, before in without["queries"].items():
+        after = with_change["queries"][label]
+        print(f"\n{label}")
+        print(f"  page  {before['page_ms']:9.2f} ms -> {after['page_ms']:9.2f} ms")
+        print(f"  count {before['count_ms']:9.2f} ms -> {after['count_ms']:9.2f} ms")
+        print("  page plan before: " + " | ".join(before["page_plan"]))
+        print("  page plan after:  " + " | ".join(after["page_plan"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "database": engine.url.get_backend_name(),
+                "created": creates,
+                "dropped": drops,
+                "without": without,
+                "with": with_change,
+            }, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic records dataset for benchmarking
+
+Distributions are skewed like production data: a few zones and sellers take
+most of the orders (Zipf weights), about a third of orders come from repeat
+clients, recent months are busier, and some phones are stored in other formats.
+Rows are inserted with executemany in batches; the sales rollup is rebuilt once at the end.
+A new database gets the app's tables plus the search indexes of migration
+5b2e9c7d4a13 and is stamped at the alembic head; an existing one is left as is.
+
+Usage: python -m benchmarks.generate_data --rows 100000 [--database-url sqlite:///./bench.db] [--seed 42]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Baseline revision (alters an existing records table) and the search revision on top of it
+BASELINE_REVISION = "ca301e741ff2"
+SEARCH_REVISION = "5b2e9c7d4a13"
+
+ZONES = [
+    "Delhi", "Gurgaon", "Noida", "GGN", "Faridabad", "Ghaziabad", "Sonipat", "Panipat",
+    "Meerut", "Rohtak", "Karnal", "Jaipur", "Chandigarh", "Ludhiana", "Agra", "Dehradun"
+]
+SELLERS = [
+    "Rajesh Kumar", "Priya Sharma", "Amit Singh", "Neha Patel", "Vikram Mehta", "Sneha Desai",
+    "Arun Gupta", "Kavita Rao", "Manoj Yadav", "Pooja Verma", "Suresh Nair", "Ritu Malhotra"
+]
+LEAD_SOURCES = ["Referral", "Website", "Walk-in", "Phone Call", "Social Media", "Advertisement", "Dealer"]
+CAPACITY_KW = ["6", "9", "12", "15", "18", "24"]
+HEATERS = ["Kunal", "Luxmi", "Dovy"]
+CONTROLLERS = ["6-button", "3-button", "touch"]
+CARDS = ["3-button", "6-button"]
+BODIES = ["MS", "SS"]
+FIRST_NAMES = [
+    "Ravi", "Sunita", "Anil", "Kavita", "Mohammed", "Pooja", "Suresh", "Meera", "Rajesh", "Anjali",
+    "Vikram", "Divya", "Kiran", "Arjun", "Neha", "Rohit", "Shreya", "Amit", "Pallavi", "Nikhil",
+    "Anita", "Sandeep", "Richa", "Karan", "Jyoti", "Manish", "Swati", "Vivek", "Ritu", "Ajay"
+]
+LAST_NAMES = [
+    "Kumar", "Devi", "Sharma", "Singh", "Ali", "Gupta", "Reddy", "Patel", "Iyer", "Nair",
+    "Joshi", "Rao", "Desai", "Malhotra", "Chopra", "Agarwal", "Jain", "Verma", "Shah", "Kapoor"
+]
+STREETS = ["Main Road", "MG Road", "Park Street", "Market Road", "Residency Road", "Station Road", "Sector 14"]
+HISTORY_DAYS = 3 * 365
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    """Weights where the k-th most common value is about k^s times rarer than the first"""
+    return [1 / (k ** s) for k in range(1, n + 1)]
+
+
+def optional(rng: random.Random, values: list, weights=None, none_rate: float = 0.08):
+    if rng.random() < none_rate:
+        return None
+    return rng.choices(values, weights)[0]
+
+
+def format_phone(rng: random.Random, digits: str) -> str:
+    """Most phones are stored as 10 digits; some carry a country code or separators"""
+    roll = rng.random()
+    if roll < 0.08:
+        return f"+91 {digits[:5]} {digits[5:]}"
+    if roll < 0.12:
+        return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+    if roll < 0.15:
+        return f"0{digits}"
+    return digits
+
+
+class ClientPool:
+    """Clients placed so far; repeat orders pick earlier clients, favouring a loyal few"""
+
+    def __init__(self, rng: random.Random, repeat_rate: float):
+        self.rng = rng
+        self.repeat_rate = repeat_rate
+        self.clients: list[tuple[str, str, str, str]] = []
+
+    def next(self, zone_weights: list[float]) -> tuple[str, str, str, str]:
+        rng = self.rng
+        if self.clients and rng.random() < self.repeat_rate:
+            # Pareto-distributed index: low indexes (early, loyal clients) repeat most
+            index = min(int(rng.paretovariate(1.2)) - 1, len(self.clients) - 1)
+            return self.clients[index]
+        zone = rng.choices(ZONES, zone_weights)[0]
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        phone = str(rng.choice("6789")) + "".join(rng.choice("0123456789") for _ in range(9))
+        address = f"{rng.randint(1, 999)}, {rng.choice(STREETS)}, {zone}"
+        client = (name, phone, address, zone)
+        self.clients.append(client)
+        return client
+
+
+def generate_rows(count: int, rng: random.Random, pool: ClientPool, today: date):
+    """Yield record dicts without record_id"""
+    zone_weights = zipf_weights(len(ZONES))
+    seller_weights = zipf_weights(len(SELLERS), 0.8)
+    source_weights = zipf_weights(len(LEAD_SOURCES), 0.9)
+    capacity_weights = [4, 6, 5, 3, 2, 1]
+
+    for _ in range(count):
+        name, phone, address, zone = pool.next(zone_weights)
+        # Busier recent months: the exponent skews ages towards zero
+        age_days = int(HISTORY_DAYS * rng.random() ** 1.6)
+        delivered = today - timedelta(days=age_days)
+        installed = delivered + timedelta(days=rng.randint(1, 14)) if rng.random() < 0.9 else None
+        visited = (
+            datetime.combine(installed + timedelta(days=rng.randint(30, 300)), datetime.min.time())
+            if installed and rng.random() < 0.3 and installed + timedelta(days=30) < today else None
+        )
+        capacity = rng.choices(CAPACITY_KW, capacity_weights)[0]
+        sale_price = None if rng.random() < 0.12 else round(rng.lognormvariate(11.6, 0.35) + int(capacity) * 2500, 2)
+        yield {
+            "date_of_delivery": delivered,
+            "date_of_installation": installed,
+            "date_of_site_visit": visited,
+            "site_visit_done_by": rng.choice(SELLERS) if visited else None,
+            "installation_done_by": rng.choice(SELLERS) if installed else None,
+            "commission_done_by": rng.choice(SELLERS) if installed and rng.random() < 0.5 else None,
+            "capacity_kw": capacity,
+            "heater": optional(rng, HEATERS),
+            "controller": optional(rng, CONTROLLERS),
+            "card": optional(rng, CARDS),
+            "body": optional(rng, BODIES),
+            "client_name": name,
+            "client_phone": format_phone(rng, phone) if rng.random() > 0.03 else None,
+            "client_address": address,
+            "zone": zone if rng.random() > 0.02 else None,
+            "sale_price": sale_price,
+            "sold_by": optional(rng, SELLERS, seller_weights, 0.05),
+            "lead_source": optional(rng, LEAD_SOURCES, source_weights, 0.1),
+            "remarks": "Repeat order" if rng.random() < 0.05 else None,
+        }
+
+
+def create_schema(engine) -> None:
+    """
+    Tables as app.main creates them, plus the FTS5 table and triggers (or the
+    PostgreSQL search indexes) that only the search migration creates, so the
+    search scenarios measure the indexed path rather than the ILIKE fallback.
+    Later migrations only add what create_all already made, so the database
+    is stamped at head. Databases already under alembic are left alone.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from app.database import Base
+
+    with engine.connect() as conn:
+        migrated = MigrationContext.configure(conn).get_current_revision() is not None
+    if migrated:
+        return
+    Base.metadata.create_all(bind=engine)
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, SEARCH_REVISION)
+    command.stamp(config, "head")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic records for benchmarking")
+    parser.add_argument("--rows", type=int, default=10000, help="Records to insert (default: 10000)")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL / app setting)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany (default: 5000)")
+    parser.add_argument("--repeat-rate", type=float, default=0.35, help="Share of orders from repeat clients")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Imported after DATABASE_URL is set so the app engine points at the target database
+    from sqlalchemy import insert
+    from app.database import SessionLocal, engine
+    from app.models import Record
+    from app.crud import allocate_record_ids, rebuild_sales_rollup, bump_data_versions
+    from app.utils.phone import normalize_phone
+
+    create_schema(engine)
+    rng = random.Random(args.seed)
+    pool = ClientPool(rng, args.repeat_rate)
+    rows = generate_rows(args.rows, rng, pool, date.today())
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    inserted = 0
+    try:
+        while inserted < args.rows:
+            batch = [row for _, row in zip(range(min(args.batch_size, args.rows - inserted)), rows)]
+            for row, record_id in zip(batch, allocate_record_ids(db, len(batch))):
+                row["record_id"] = record_id
+                row["client_phone_normalized"] = normalize_phone(row["client_phone"])
+            # Core insert: one executemany per batch (the ORM bulk path splits batches by None pattern)
+            db.execute(insert(Record.__table__), batch)
+            db.commit()
+            inserted += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"\r{inserted}/{args.rows} rows ({inserted / elapsed:,.0f} rows/s)", end="", file=sys.stderr)
+        print(file=sys.stderr)
+        buckets = rebuild_sales_rollup(db)
+        bump_data_versions(db, "records", "filter_options")
+        db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {inserted} records for {len(pool.clients)} clients in {elapsed:.1f}s; rollup has {buckets} buckets")
+
+
+if __name__ == "__main__":
+    main()
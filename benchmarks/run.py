@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Run API benchmark scenarios in-process and write machine-readable results
+
+Each scenario issues requests through Starlette's TestClient against the real
+app and database (no network), records per-request latency and reports
+p50/p95/p99, mean and throughput. Results are JSON so runs on different
+commits can be compared with benchmarks/compare.py.
+
+Usage: python -m benchmarks.run --database-url sqlite:///./bench.db [--scenarios list,search] [--output results.json]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Generator, Optional
+from urllib.parse import urlencode
+
+# A request stream yields paths and is sent back each response (for cursor walking)
+RequestStream = Generator[str, object, None]
+
+
+class Scenario:
+    """A named stream of GET requests issued with one role's token"""
+
+    def __init__(self, name: str, role: str, requests: Callable[["Context"], RequestStream], iterations: int = 200):
+        self.name = name
+        self.role = role
+        self.requests = requests
+        self.iterations = iterations
+
+
+class Context:
+    """Sample values drawn from the benchmark database to build realistic requests"""
+
+    def __init__(self, client, headers: dict[str, dict], seed: int):
+        self.client = client
+        self.headers = headers
+        self.rng = random.Random(seed)
+        options = client.get("/filters/options", headers=headers["maintenance"]).json()
+        self.zones = options["zones"] or [None]
+        self.sellers = options["sold_by"] or [None]
+        page = client.get("/records?page=1&page_size=100", headers=headers["maintenance"]).json()["records"]
+        self.names = [r["client_name"] for r in page] or ["a"]
+        self.phones = [r["client_phone"] for r in page if r["client_phone"]] or ["9"]
+
+    def date_range(self) -> dict:
+        start = date.today() - timedelta(days=self.rng.randint(60, 900))
+        end = start + timedelta(days=self.rng.randint(30, 365))
+        return {"date_from": f"{start.isoformat()}T00:00:00", "date_to": f"{end.isoformat()}T23:59:59"}
+
+
+def search_backend(db) -> str:
+    """Which index the search scenario exercises on this database"""
+    from sqlalchemy import text
+    from app.utils.search import get_fts_tokenizer
+
+    if db.get_bind().dialect.name == "sqlite":
+        tokenizer = get_fts_tokenizer(db)
+        return f"fts5-{tokenizer}" if tokenizer else "ilike"
+    if db.get_bind().dialect.name == "postgresql":
+        indexed = db.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = 'idx_records_search_trgm'")).first()
+        return "pg_trgm" if indexed else "ilike"
+    return "ilike"
+
+
+def url(path: str, **params) -> str:
+    query = urlencode({key: value for key, value in params.items() if value is not None})
+    return f"{path}?{query}" if query else path
+
+
+def _list_pages(ctx: Context) -> RequestStream:
+    while True:
+        yield url("/records", page=ctx.rng.randint(1, 20), page_size=50)
+
+
+def _deep_offset_pages(ctx: Context) -> RequestStream:
+    while True:
+        yield url("/records", page=ctx.rng.randint(100, 1000), page_size=50)
+
+
+def _cursor_pages(ctx: Context) -> RequestStream:
+    # Walk a zone filter page by page with keyset cursors, restarting after 20 pages or at the end
+    while True:
+        zone = ctx.rng.choice(ctx.zones)
+        cursor = ""
+        for _ in range(20):
+            response = yield url("/records", page_size=50, zone=zone, cursor=cursor)
+            cursor = response.json().get("next_cursor")
+            if not cursor:
+                break
+
+
+def _search(ctx: Context) -> RequestStream:
+    while True:
+        roll = ctx.rng.random()
+        if roll < 0.5:
+            term = ctx.rng.choice(ctx.names).split()[0]
+        elif roll < 0.8:
+            term = ctx.rng.choice(ctx.phones)[-6:]
+        else:
+            term = "Road"
+        yield url("/records", search=term, page_size=50, sort_by="relevance")
+
+
+def _filters(ctx: Context) -> RequestStream:
+    while True:
+        yield url(
+            "/records", zone=ctx.rng.choice(ctx.zones), sold_by=ctx.rng.choice(ctx.sellers),
+            page_size=50, **ctx.date_range()
+        )
+
+
+def _sales_summary(ctx: Context) -> RequestStream:
+    # Few distinct filter sets, as when managers reload the dashboard
+    variants = [url("/sales/summary")] + [url("/sales/summary", zone=zone) for zone in ctx.zones[:5]]
+    while True:
+        yield ctx.rng.choice(variants)
+
+
+def _sales_summary_uncached(ctx: Context) -> RequestStream:
+    from app.config import settings
+    enabled = settings.response_cache_enabled
+    settings.response_cache_enabled = False
+    try:
+        while True:
+            yield url("/sales/summary", zone=ctx.rng.choice(ctx.zones), **ctx.date_range())
+    finally:
+        settings.response_cache_enabled = enabled
+
+
+def _warranty_summary(ctx: Context) -> RequestStream:
+    while True:
+        yield url("/records/warranty/summary", days=ctx.rng.choice([7, 30, 90]))
+
+
+def _filter_options(ctx: Context) -> RequestStream:
+    while True:
+        yield url("/filters/options")
+
+
+def _export(fmt: str, filtered: bool = True) -> Callable[[Context], RequestStream]:
+    def requests(ctx: Context) -> RequestStream:
+        while True:
+            if filtered:
+                # One zone over a quarter, the typical report export
+                start = date.today() - timedelta(days=ctx.rng.randint(90, 720))
+                yield url(
+                    f"/export/records.{fmt}", zone=ctx.rng.choice(ctx.zones),
+                    date_from=f"{start.isoformat()}T00:00:00",
+                    date_to=f"{(start + timedelta(days=90)).isoformat()}T23:59:59"
+                )
+            else:
+                yield url(f"/export/records.{fmt}")
+    return requests
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario("list", "maintenance", _list_pages),
+        Scenario("list_deep_offset", "maintenance", _deep_offset_pages, 100),
+        Scenario("list_cursor", "maintenance", _cursor_pages),
+        Scenario("search", "maintenance", _search),
+        Scenario("filter", "maintenance", _filters),
+        Scenario("filter_options", "maintenance", _filter_options),
+        Scenario("sales_summary", "sales", _sales_summary),
+        Scenario("sales_summary_uncached", "sales", _sales_summary_uncached, 50),
+        Scenario("warranty_summary", "maintenance", _warranty_summary, 100),
+        Scenario("export_csv", "maintenance", _export("csv"), 10),
+        Scenario("export_xlsx", "maintenance", _export("xlsx"), 5),
+        Scenario("export_pdf", "maintenance", _export("pdf"), 3),
+        Scenario("export_csv_all", "maintenance", _export("csv", filtered=False), 3),
+    ]
+}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(ctx: Context, scenario: Scenario, iterations: int, warmup: int) -> dict:
+    headers = ctx.headers[scenario.role]
+    requests = scenario.requests(ctx)
+    path = next(requests)
+    for _ in range(warmup):
+        path = requests.send(ctx.client.get(path, headers=headers))
+
+    latencies = []
+    errors = 0
+    response_bytes = 0
+    sql_queries = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request_start = time.perf_counter()
+        response = ctx.client.get(path, headers=headers)  # TestClient reads streamed bodies fully
+        latencies.append(time.perf_counter() - request_start)
+        response_bytes += len(response.content)
+        if response.status_code >= 400:
+            errors += 1
+        sql_queries += _server_timing_queries(response.headers.get("server-timing"))
+        path = requests.send(response)
+    elapsed = time.perf_counter() - started
+    requests.close()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "throughput_rps": round(iterations / elapsed, 2),
+        "avg_response_bytes": response_bytes // iterations,
+        "avg_sql_queries": round(sql_queries / iterations, 2),
+    }
+
+
+def _server_timing_queries(header: Optional[str]) -> int:
+    # Server-Timing: db;dur=1.2;desc="3 queries" (set by MetricsMiddleware when enabled)
+    if not header or 'desc="' not in header:
+        return 0
+    for part in header.split(","):
+        if part.strip().startswith("db;"):
+            return int(part.split('desc="')[1].split(" ")[0])
+    return 0
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run API benchmark scenarios")
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL / app setting)")
+    parser.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--iterations", type=int, help="Override the iterations of every scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests before each scenario")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for request parameters")
+    parser.add_argument("--label", help="Label stored in the results (default: git commit)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    # Imported after DATABASE_URL is set so the app engine points at the benchmark database
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    from app.main import app
+    from app.config import settings
+    from app.database import SessionLocal, engine
+    from app.models import Record
+
+    with SessionLocal() as db:
+        record_count = db.scalar(select(func.count(Record.id)))
+        search = search_backend(db)
+
+    client = TestClient(app)
+    headers = {}
+    for role, passcode in (("maintenance", settings.maintenance_passcode), ("sales", settings.sales_passcode)):
+        token = client.post("/auth/login", json={"passcode": passcode}).json()["access_token"]
+        headers[role] = {"Authorization": f"Bearer {token}"}
+    ctx = Context(client, headers, args.seed)
+
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        result = run_scenario(ctx, scenario, args.iterations or scenario.iterations, args.warmup)
+        results[name] = result
+        print(
+            f"{name:24} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+            f"p99 {result['p99_ms']:9.2f} ms  {result['throughput_rps']:8.1f} req/s",
+            file=sys.stderr
+        )
+
+    output = {
+        "meta": {
+            "label": args.label or _git_commit(),
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "database": engine.url.get_backend_name(),
+            "records": record_count,
+            "search_backend": search,
+            "async_db": settings.use_async_db,
+            "python": platform.python_version(),
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
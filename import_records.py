@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Bulk import records from a CSV, XLSX or JSON Lines file
+
+Usage: python import_records.py legacy_records.xlsx [--batch-size 1000] [--keep-record-ids]
+"""
+import argparse
+import sys
+from app.database import SessionLocal
+from app.utils.import_utils import IMPORT_FORMATS, detect_format, import_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import records from a CSV, XLSX or JSON Lines file")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=sorted(IMPORT_FORMATS), help="File format (default: from extension)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction (default: 1000)")
+    parser.add_argument("--keep-record-ids", action="store_true", help="Keep record_id values from the file")
+    args = parser.parse_args()
+    
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("Cannot detect the file format; pass --format")
+    
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            result = import_records(db, f, fmt, args.batch_size, args.keep_record_ids)
+    finally:
+        db.close()
+    
+    for error in result["errors"]:
+        print(f"Row {error['row']}: {'; '.join(error['errors'])}", file=sys.stderr)
+    print(f"Imported {result['inserted']} of {result['total']} rows ({result['failed']} failed)")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Rebuild the sales_monthly_rollup table from records
+
+The rollup is maintained automatically on every record write; run this after
+editing records directly in the database or if the rollup is suspected stale.
+"""
+from app.database import SessionLocal
+from app.crud import rebuild_sales_rollup
+
+
+def main():
+    db = SessionLocal()
+    try:
+        buckets = rebuild_sales_rollup(db)
+    finally:
+        db.close()
+    print(f"Rebuilt sales_monthly_rollup: {buckets} buckets")
+
+
+if __name__ == "__main__":
+    main()
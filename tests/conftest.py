@@ -0,0 +1,96 @@
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# Settings read DATABASE_URL at import time, so point it at a scratch database first
+_TMP_DIR = tempfile.mkdtemp(prefix="maintenance_crm_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from app import crud  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.schemas import RecordCreate, RecordFilters, RecordUpdate  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+SEARCH_REVISION_PARENT = "ca301e741ff2"
+SEARCH_REVISION = "5b2e9c7d4a13"
+
+ZONES = ["North", "South", "East", "West", None]
+SELLERS = ["Asha", "Ravi", "Meena", None]
+LEAD_SOURCES = ["Referral", "Website", "Walk-in", None]
+FIRST_NAMES = ["Ramesh", "Suresh", "Anita", "Priya", "Vikram", "Kavita", "Arjun", "Deepa"]
+LAST_NAMES = ["Kumar", "Sharma", "Patel", "Iyer", "Reddy", "Nair"]
+STREETS = ["MG Road", "Station Road", "Lake View", "Ring Road", "Temple Street"]
+CITIES = ["Pune", "Nashik", "Nagpur", "Kolhapur"]
+
+
+def _delivery_dates(rng: random.Random, count: int) -> list[date]:
+    """Random delivery dates, plus the first and last day of every month in the range"""
+    start, end = date(2023, 11, 1), date(2024, 6, 30)
+    days = [start + timedelta(days=rng.randrange((end - start).days + 1)) for _ in range(count)]
+    day = start
+    while day <= end:
+        days.append(day)
+        next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        days.append(next_month - timedelta(days=1))
+        day = next_month
+    return days
+
+
+def _phone(rng: random.Random) -> str:
+    number = f"9{rng.randrange(10 ** 9):09d}"
+    return rng.choice([number, f"+91 {number[:5]} {number[5:]}", f"0{number[:5]}-{number[5:]}"])
+
+
+def _seed_records(db, rng: random.Random) -> None:
+    """Records written through the crud paths, so the rollup is maintained as in production"""
+    for delivered in _delivery_dates(rng, 300):
+        crud.create_record(db, RecordCreate(
+            record_id="",
+            date_of_delivery=delivered,
+            client_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            client_phone=_phone(rng) if rng.random() < 0.9 else None,
+            client_address=f"{rng.randrange(1, 200)} {rng.choice(STREETS)}, {rng.choice(CITIES)}",
+            zone=rng.choice(ZONES),
+            sold_by=rng.choice(SELLERS),
+            lead_source=rng.choice(LEAD_SOURCES),
+            capacity_kw=rng.choice(["3", "5", "10"]),
+            sale_price=round(rng.uniform(20000, 150000), 2) if rng.random() < 0.8 else None,
+        ))
+
+    # Moves between months and zones, and deletes, exercise incremental rollup maintenance
+    records, _ = crud.get_records(db, RecordFilters(), page_size=40, sort_by="id", sort_desc=False)
+    for record in records[:20]:
+        crud.update_record(db, record.id, RecordUpdate(
+            date_of_delivery=record.date_of_delivery + timedelta(days=rng.randrange(1, 45)),
+            zone=rng.choice(ZONES),
+        ))
+    for record in records[20:30]:
+        crud.delete_record(db, record.id)
+
+
+@pytest.fixture(scope="session")
+def db():
+    # Tables as app.main creates them, plus the FTS5 table and triggers that
+    # only the search migration creates
+    Base.metadata.create_all(bind=engine)
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.stamp(config, SEARCH_REVISION_PARENT)
+    command.upgrade(config, SEARCH_REVISION)
+    command.stamp(config, "head")
+
+    session = SessionLocal()
+    _seed_records(session, random.Random(20240301))
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        shutil.rmtree(_TMP_DIR, ignore_errors=True)
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app import crud
+from app.routers.filters import _cached_filter_options
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CREATE_RECORD = """
+import sys
+from datetime import date
+from app import crud
+from app.database import SessionLocal
+from app.schemas import RecordCreate
+db = SessionLocal()
+crud.create_record(db, RecordCreate(
+    record_id="", date_of_delivery=date(2024, 5, 6), client_name="Other Worker", sale_price=1000,
+    zone=sys.argv[1]
+))
+db.close()
+"""
+
+
+def _write_from_other_process(zone: str = "North"):
+    subprocess.run([sys.executable, "-c", CREATE_RECORD, zone], cwd=ROOT, env=os.environ.copy(), check=True)
+
+
+def test_writes_in_other_processes_bump_the_records_version(db):
+    before = crud.get_data_version(db, "records")
+    _write_from_other_process()
+    db.commit()  # end the read transaction so the other process's commit is visible
+    assert crud.get_data_version(db, "records") == before + 1
+
+
+def test_sales_summary_cache_sees_writes_from_other_processes(db):
+    total = crud.get_sales_summary(db)["total_records"]
+    assert crud.get_sales_summary(db)["total_records"] == total  # served from the cache
+
+    _write_from_other_process()
+    db.commit()
+    assert crud.get_sales_summary(db)["total_records"] == total + 1
+
+
+def test_filter_options_cache_sees_new_values_from_other_processes(db):
+    options, etag = asyncio.run(_cached_filter_options(db))
+    assert "Far East" not in options["zones"]
+
+    _write_from_other_process(zone="Far East")
+    db.commit()
+    options, new_etag = asyncio.run(_cached_filter_options(db))
+    assert "Far East" in options["zones"]
+    assert new_etag != etag
@@ -0,0 +1,115 @@
+"""
+Delta sync (GET /records/changes) must hand every change and deletion to a
+client exactly once, whatever the batch size and however writes interleave
+with syncs.
+"""
+import math
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import crud
+from app.config import settings
+from app.models import Record
+from app.schemas import RecordCreate, RecordUpdate
+from app.utils.pagination import CursorExpired, encode_sync_cursor
+from app.utils.serialization import record_row_serializer
+
+COLUMNS = record_row_serializer.columns
+
+
+@pytest.fixture
+def no_lag(monkeypatch):
+    """Sync everything older than the current second (timestamps are compared to the second)"""
+    monkeypatch.setattr(settings, "sync_lag_seconds", 0)
+
+
+def _next_second():
+    time.sleep(1.1)
+
+
+def _sync(db, cursor=None, limit=500):
+    """Follow next_cursor while has_more; returns (record ids, deleted ids, final cursor, batches)"""
+    record_ids, deleted_ids, batches = [], [], 0
+    while True:
+        rows, tombstones, cursor, has_more = crud.get_record_changes(db, COLUMNS, cursor, limit)
+        record_ids += [row.id for row in rows]
+        deleted_ids += [tombstone.record_pk for tombstone in tombstones]
+        batches += 1
+        if not has_more:
+            return record_ids, deleted_ids, cursor, batches
+
+
+def _new_record(**fields) -> RecordCreate:
+    return RecordCreate(record_id="", date_of_delivery=date(2024, 5, 6), client_name="Sync Test", **fields)
+
+
+def test_full_sync_pages_through_every_record_once(db, no_lag):
+    _next_second()
+    all_ids = {record_id for record_id, in db.query(Record.id)}
+
+    record_ids, deleted_ids, _, batches = _sync(db, limit=37)
+    assert len(record_ids) == len(set(record_ids))
+    assert set(record_ids) == all_ids
+    assert batches == math.ceil(len(all_ids) / 37)
+    # Deletions made before the first sync are not sent
+    assert deleted_ids == []
+
+
+def test_sync_from_cursor_sends_only_later_changes_and_deletions(db, no_lag):
+    _next_second()
+    cursor = _sync(db)[2]
+    existing = [record.id for record in db.query(Record).order_by(Record.id).limit(2)]
+
+    created = crud.create_record(db, _new_record()).id
+    crud.update_record(db, existing[0], RecordUpdate(remarks="changed since the last sync"))
+    crud.delete_record(db, existing[1])
+    _next_second()
+
+    record_ids, deleted_ids, cursor, _ = _sync(db, cursor, limit=1)
+    assert sorted(record_ids) == sorted([created, existing[0]])
+    assert deleted_ids == [existing[1]]
+
+    # Nothing changed since: an empty batch that keeps the position
+    assert _sync(db, cursor)[:2] == ([], [])
+
+
+def test_changes_inside_the_lag_are_sent_by_the_next_sync(db, monkeypatch):
+    monkeypatch.setattr(settings, "sync_lag_seconds", 30)
+    cursor = _sync(db)[2]
+
+    created = crud.create_record(db, _new_record()).id
+    record_ids, _, cursor, _ = _sync(db, cursor)
+    assert created not in record_ids
+
+    monkeypatch.setattr(settings, "sync_lag_seconds", 0)
+    _next_second()
+    # Also sends whatever earlier tests wrote within the 30 seconds
+    assert created in _sync(db, cursor)[0]
+
+
+def test_deletions_are_paged_before_records(db, no_lag):
+    _next_second()
+    cursor = _sync(db)[2]
+    doomed = [crud.create_record(db, _new_record()).id for _ in range(3)]
+    kept = crud.create_record(db, _new_record()).id
+    for record_id in doomed:
+        crud.delete_record(db, record_id)
+    _next_second()
+
+    rows, tombstones, cursor, has_more = crud.get_record_changes(db, COLUMNS, cursor, limit=2)
+    assert ([row.id for row in rows], [t.record_pk for t in tombstones], has_more) == ([], doomed[:2], True)
+
+    rows, tombstones, cursor, has_more = crud.get_record_changes(db, COLUMNS, cursor, limit=2)
+    assert ([row.id for row in rows], [t.record_pk for t in tombstones], has_more) == ([kept], doomed[2:], False)
+
+
+def test_expired_and_invalid_cursors_are_rejected(db):
+    expired = encode_sync_cursor(
+        None, None, 0, datetime.utcnow() - timedelta(days=settings.sync_tombstone_retention_days + 1)
+    )
+    with pytest.raises(CursorExpired):
+        crud.get_record_changes(db, COLUMNS, expired)
+    with pytest.raises(ValueError):
+        crud.get_record_changes(db, COLUMNS, "not-a-cursor")
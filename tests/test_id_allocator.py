@@ -0,0 +1,79 @@
+from datetime import date
+
+from app import crud
+from app.database import SessionLocal, engine
+from app.models import Record
+from app.schemas import RecordCreate, RecordUpdate
+from app.utils.id_allocator import RecordIdAllocator, format_record_id, parse_record_number
+
+
+def _new_record(record_id: str = "") -> RecordCreate:
+    return RecordCreate(record_id=record_id, date_of_delivery=date(2024, 5, 6), client_name="Allocator Test")
+
+
+def test_blocks_are_reused_while_no_explicit_ids_are_reserved(db):
+    allocator = RecordIdAllocator(engine, block_size=20)
+    numbers = allocator.allocate(1) + allocator.allocate(1) + allocator.allocate(1)
+    assert numbers == list(range(numbers[0], numbers[0] + 3))
+
+
+def test_several_blocks_are_reserved_inside_an_open_write_transaction(db):
+    # The flushed write holds SQLite's write lock; reserving on another connection would time out
+    crud.bump_data_versions(db, "allocator_test")
+    db.flush()
+    record_ids = [crud.generate_record_id(db) for _ in range(45)]
+    db.commit()
+
+    assert len(set(record_ids)) == 45
+    assert crud.generate_record_id(db) not in record_ids
+    db.commit()
+
+
+def test_rolled_back_reservations_drop_the_block(db):
+    allocator = RecordIdAllocator(engine, block_size=5)
+    crud.bump_data_versions(db, "allocator_test")
+    rolled_back = allocator.allocate(3, db)
+    db.rollback()
+
+    # The counter went back with the transaction, so the block must not be used either
+    numbers = allocator.allocate(3, db)
+    db.commit()
+    assert numbers == rolled_back
+    assert allocator.allocate(1, db)[0] not in numbers
+    db.commit()
+
+
+def test_reserving_an_explicit_id_drops_this_processes_block(db):
+    allocator = RecordIdAllocator(engine, block_size=20)
+    start = allocator.allocate(1)[0]
+
+    explicit = start + 5  # inside the block the allocator holds
+    allocator.advance_past(explicit)
+
+    numbers = allocator.allocate(30)
+    assert explicit not in numbers
+    assert min(numbers) > explicit
+
+
+def test_generated_id_taken_by_another_process_is_retried(db):
+    taken = parse_record_number(crud.generate_record_id(db)) + 1  # next number in this process's block
+    db.commit()
+
+    # Another process inserts that number as an explicit ID
+    other = SessionLocal()
+    RecordIdAllocator(engine).advance_past(taken)
+    other.add(Record(record_id=format_record_id(taken), date_of_delivery=date(2024, 5, 6), client_name="Other"))
+    other.commit()
+    other.close()
+
+    record = crud.create_record(db, _new_record())
+    assert parse_record_number(record.record_id) > taken
+
+
+def test_changing_a_record_id_keeps_it_from_being_generated(db):
+    record = crud.create_record(db, _new_record())
+    changed = format_record_id(parse_record_number(record.record_id) + 3)
+    crud.update_record(db, record.id, RecordUpdate(record_id=changed))
+
+    generated = [crud.create_record(db, _new_record()).record_id for _ in range(5)]
+    assert changed not in generated
@@ -0,0 +1,154 @@
+"""
+Bulk import (POST /records/import) reports invalid rows per row, inserts the
+rest, and keeps explicitly supplied record IDs out of the generated range.
+"""
+import io
+import json
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+from app import crud
+from app.config import settings
+from app.main import app
+from app.models import Record
+from app.utils.id_allocator import format_record_id, parse_record_number
+from app.utils.import_utils import import_records
+
+
+def _csv(*lines: str) -> io.BytesIO:
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def _jsonl(*items) -> io.BytesIO:
+    return io.BytesIO("\n".join(item if isinstance(item, str) else json.dumps(item) for item in items).encode())
+
+
+def _unused_record_id(db, ahead: int) -> str:
+    """An RMZ- ID ahead of every generated one so far"""
+    number = parse_record_number(crud.generate_record_id(db))
+    db.commit()
+    return format_record_id(number + ahead)
+
+
+def _names(db, record_ids: list[str]) -> dict[str, str]:
+    return dict(db.query(Record.record_id, Record.client_name).filter(Record.record_id.in_(record_ids)))
+
+
+def test_invalid_rows_are_reported_and_valid_rows_inserted(db):
+    before = db.query(Record).count()
+    result = import_records(db, _csv(
+        "Record ID,Date of Delivery,Client Name,Client Phone,Sale Price",
+        ",2024-05-01,Import Valid One,98765 43210,45000",
+        ",not-a-date,Import Bad Date,,",
+        ",2024-05-02,,,",
+        ",,,,",  # blank rows are skipped, not counted
+        ",2024-05-03,Import Valid Two,,abc",
+        ",2024-05-04,Import Valid Three,,",
+    ), "csv", batch_size=2)
+
+    assert (result["total"], result["inserted"], result["failed"]) == (5, 2, 3)
+    assert [error["row"] for error in result["errors"]] == [2, 3, 5]
+    assert result["errors"][0]["errors"][0].startswith("date_of_delivery:")
+    assert result["errors"][1]["errors"][0].startswith("client_name:")
+    assert result["errors"][2]["errors"][0].startswith("sale_price:")
+    assert db.query(Record).count() == before + 2
+
+    imported = db.query(Record).filter(Record.client_name == "Import Valid One").one()
+    assert parse_record_number(imported.record_id) is not None  # generated, the file had none
+    assert imported.client_phone_normalized == "9876543210"
+
+
+def test_unparseable_jsonl_lines_are_reported_per_row(db):
+    result = import_records(db, _jsonl(
+        {"date_of_delivery": "2024-05-01", "client_name": "Import JSON One"},
+        "{not json",
+        "[1, 2]",
+        {"date_of_delivery": "2024-05-02", "client_name": "Import JSON Two", "unknown_field": "ignored"},
+    ), "jsonl")
+
+    assert (result["total"], result["inserted"], result["failed"]) == (4, 2, 2)
+    assert result["errors"][0]["row"] == 2 and result["errors"][0]["errors"][0].startswith("Invalid JSON")
+    assert result["errors"][1] == {"row": 3, "errors": ["Expected a JSON object"]}
+
+
+def test_explicit_record_ids_are_kept_and_reserved(db):
+    explicit = _unused_record_id(db, ahead=100)
+    result = import_records(db, _jsonl(
+        {"record_id": explicit, "date_of_delivery": "2024-05-01", "client_name": "Import Explicit"},
+        {"date_of_delivery": "2024-05-01", "client_name": "Import Generated"},
+    ), "jsonl", keep_record_ids=True)
+
+    assert result["inserted"] == 2
+    assert _names(db, [explicit]) == {explicit: "Import Explicit"}
+    # Generated IDs continue after the explicit one instead of running into it
+    generated = db.query(Record.record_id).filter(Record.client_name == "Import Generated").scalar()
+    assert parse_record_number(generated) > parse_record_number(explicit)
+    assert parse_record_number(crud.generate_record_id(db)) > parse_record_number(explicit)
+    db.commit()
+
+
+def test_record_ids_are_ignored_unless_kept(db):
+    explicit = _unused_record_id(db, ahead=200)
+    result = import_records(db, _jsonl(
+        {"record_id": explicit, "date_of_delivery": "2024-05-01", "client_name": "Import Ignored ID"},
+    ), "jsonl")
+
+    assert result["inserted"] == 1
+    assert _names(db, [explicit]) == {}
+
+
+def test_duplicate_record_ids_fail_only_their_rows(db):
+    existing = db.query(Record.record_id).first()[0]
+    new_id = _unused_record_id(db, ahead=300)
+    result = import_records(db, _jsonl(
+        {"record_id": existing, "date_of_delivery": "2024-05-01", "client_name": "Import Duplicate Existing"},
+        {"record_id": new_id, "date_of_delivery": "2024-05-01", "client_name": "Import New ID"},
+        {"record_id": new_id, "date_of_delivery": "2024-05-01", "client_name": "Import Duplicate In File"},
+        {"date_of_delivery": "2024-05-01", "client_name": "Import Same Batch"},
+    ), "jsonl", batch_size=4, keep_record_ids=True)
+
+    assert (result["total"], result["inserted"], result["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in result["errors"]] == [1, 3]
+    assert all("UNIQUE" in error["errors"][0] for error in result["errors"])
+    assert _names(db, [existing, new_id])[new_id] == "Import New ID"
+    assert db.query(Record).filter(Record.client_name == "Import Same Batch").count() == 1
+    # The batch was retried row by row; the counter must still be past the explicit ID
+    assert parse_record_number(crud.generate_record_id(db)) > parse_record_number(new_id)
+    db.commit()
+
+
+def test_import_endpoint_accepts_xlsx_with_export_headers(db):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Date of Delivery", "Client Name", "Zone", "Capacity (KW)"])
+    sheet.append(["2024-05-01", "Import XLSX", "North", 5])
+    sheet.append(["2024-05-01", None, "North", 5])
+    content = io.BytesIO()
+    workbook.save(content)
+
+    client = TestClient(app)
+    token = client.post("/auth/login", json={"passcode": settings.maintenance_passcode}).json()["access_token"]
+    response = client.post(
+        "/records/import",
+        files={"file": ("records.xlsx", content.getvalue())},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["inserted"], body["failed"]) == (2, 1, 1)
+    assert body["errors"][0]["row"] == 2
+    db.commit()  # see the endpoint's commit
+    assert db.query(Record.capacity_kw).filter(Record.client_name == "Import XLSX").scalar() == "5"
+
+
+def test_import_endpoint_rejects_unknown_formats(db):
+    client = TestClient(app)
+    token = client.post("/auth/login", json={"passcode": settings.maintenance_passcode}).json()["access_token"]
+    response = client.post(
+        "/records/import",
+        files={"file": ("records.txt", b"anything")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
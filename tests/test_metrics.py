@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+
+def test_metrics_need_a_login_or_the_scrape_token(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/metrics").status_code in (401, 403)
+    assert client.get("/metrics", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+
+    token = client.post("/auth/login", json={"passcode": settings.sales_passcode}).json()["access_token"]
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-other"}).status_code == 401
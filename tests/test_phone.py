@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+from app import crud
+from app.models import Record
+from app.schemas import RecordCreate, RecordFilters, RecordUpdate
+from app.utils.phone import normalize_phone, phone_search_key
+
+
+@pytest.mark.parametrize("phone", [
+    "9876543210",
+    "98765 43210",
+    "+91 98765 43210",
+    "+91-98765-43210",
+    "+919876543210",
+    "919876543210",
+    "0091 98765 43210",
+    "098765-43210",
+    "+91 0 98765 43210",
+    "(+91) 98765.43210",
+    " 98765/43210 ",
+])
+def test_formats_of_one_mobile_number_normalize_alike(phone):
+    assert normalize_phone(phone) == "9876543210"
+
+
+@pytest.mark.parametrize("phone, expected", [
+    (None, None),
+    ("", None),
+    ("n/a", None),
+    ("011-2345 6789", "1123456789"),  # landline with trunk 0
+    ("9198765432", "9198765432"),  # ten digits starting with 91 are not a country code
+    ("+1 415 555 0100", "14155550100"),  # other country codes are kept
+])
+def test_other_values_normalize(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("98765", None),  # too short to be treated as a phone number
+    ("987654", "987654"),
+    ("98765-432", "98765432"),
+    ("+91 987654", "987654"),
+    ("0091-98765 43", "9876543"),
+    ("+91 98765 43210", "9876543210"),
+    ("Kumar", None),
+    ("RMZ-000123", None),
+])
+def test_phone_search_keys(term, expected):
+    assert phone_search_key(term) == expected
+
+
+def _order(phone: str, delivered: date) -> RecordCreate:
+    return RecordCreate(record_id="", date_of_delivery=delivered, client_name="Phone Test", client_phone=phone)
+
+
+def test_history_and_search_match_a_number_in_any_format(db):
+    orders = [
+        crud.create_record(db, _order("+91 97000 11122", date(2024, 1, 5))),
+        crud.create_record(db, _order("097000-11122", date(2024, 3, 9))),
+        crud.create_record(db, _order("9700011122", date(2024, 2, 7))),
+    ]
+    other = crud.create_record(db, _order("97000 11133", date(2024, 4, 1)))
+    # A corrected number moves an order into the history, a changed one moves it out
+    crud.update_record(db, other.id, RecordUpdate(client_phone="0091 97000 11122"))
+    crud.update_record(db, orders[2].id, RecordUpdate(client_phone="+91 97000 99999"))
+    expected = [other.id, orders[1].id, orders[0].id]  # newest delivery first
+
+    for lookup in ("9700011122", "+91-97000-11122", "0 97000 11122"):
+        assert [record.id for record in crud.get_records_by_client_phone(db, lookup)] == expected
+    assert crud.get_client_summary(db, "+919700011122")["order_count"] == 3
+    assert db.query(Record.client_phone_normalized).filter(Record.id == orders[2].id).scalar() == "9700099999"
+
+    for term in ("+91 97000 11122", "097000-111", "9700011"):
+        found = crud._apply_filters(db.query(Record.id), RecordFilters(search=term)).all()
+        assert set(expected) <= {record_id for record_id, in found}
+        assert orders[2].id not in {record_id for record_id, in found}